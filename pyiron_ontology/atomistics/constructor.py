@@ -7,16 +7,30 @@ A constructor for building the atomistics ontology from python classes.
 
 from __future__ import annotations
 
+from typing import Optional
+
 import owlready2 as owl
 
 from pyiron_ontology.constructor import Constructor
+from pyiron_ontology.reasoner import ReasonerSession
 
 
 class AtomisticsOntology(Constructor):
     def __init__(
-        self, name: str = "atomistics", closed: bool = True, strict: bool = False
+        self,
+        name: str = "atomistics",
+        closed: bool = True,
+        strict: bool = False,
+        cache_dir: Optional[str] = None,
+        reasoner: str | ReasonerSession = "pellet",
     ):
-        super().__init__(name=name, closed=closed, strict=strict)
+        super().__init__(
+            name=name,
+            closed=closed,
+            strict=strict,
+            cache_dir=cache_dir,
+            reasoner=reasoner,
+        )
 
     def _make_specific_declarations(self):
         Generic = self.onto.Generic
@@ -7,10 +7,16 @@ A constructor for building the atomistics ontology from python classes.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Number
+from typing import TYPE_CHECKING, Iterator, Optional
 
+import numpy as np
 import pandas as pd
 
+from pyiron_ontology.cache import SearchCache
+from pyiron_ontology.constructor import UREG
+
 if TYPE_CHECKING:
     import pyiron_atomistics
 
@@ -20,8 +26,38 @@ if TYPE_CHECKING:
 
 
 class AtomisticsReasoner:
-    def __init__(self, ontology):
+    """
+    Searches pyiron data for the things in an atomistics ontology.
+
+    Args:
+        ontology: The atomistics ontology.
+        cache_dir (str | None): A directory to keep the values read from jobs in, so
+            repeating a search only reads new or changed jobs. (Default is None, don't
+            cache.)
+    """
+
+    query_batch_size = 500  # Ids per query, well inside SQL expression limits
+
+    def __init__(self, ontology, cache_dir: Optional[str] = None):
         self.onto = ontology
+        self.cache = SearchCache(cache_dir) if cache_dir is not None else None
+        self._job_types = {}
+        self._engine_names = None
+
+    @property
+    def engine_names(self) -> set[str]:
+        """The pyiron names of the functions which are themselves engines"""
+        if self._engine_names is None:
+            self._engine_names = {
+                function.pyiron_name
+                for function in self.onto.AtomisticsFunction.instances()
+                if function.pyiron_name is not None
+                and any(
+                    isinstance(out.generic, self.onto.AtomisticsJob)
+                    for out in function.outputs
+                )
+            }
+        return self._engine_names
 
     @staticmethod
     def _get_ref_job(job):
@@ -36,6 +72,41 @@ class AtomisticsReasoner:
         else:
             return job["TYPE"]
 
+    def _get_job_types(
+        self,
+        project: pyiron_atomistics.Project,
+        job_ids: list[int],
+        hamiltons: list[str],
+    ) -> list[Optional[str]]:
+        """
+        Find the engines of jobs without opening their HDF files, where possible.
+
+        Engine jobs are their own engine, and other jobs (like a Murnaghan) take the
+        engine of their child jobs, which are looked up in the database in batches.
+        Answers are remembered per job id.
+
+        Returns:
+            (list[str | None]): The engine of each job, or None where the database
+                doesn't tell (and `_get_job_type` needs the job itself).
+        """
+        unknown = {}
+        for job_id, hamilton in zip(job_ids, hamiltons):
+            if job_id in self._job_types:
+                continue
+            elif hamilton in self.engine_names:
+                self._job_types[job_id] = hamilton
+            else:
+                unknown[job_id] = None
+
+        unknown = list(unknown)
+        for start in range(0, len(unknown), self.query_batch_size):
+            for child in project.db.get_items_dict(
+                {"masterid": unknown[start : start + self.query_batch_size]}
+            ):
+                if child["hamilton"] in self.engine_names:
+                    self._job_types.setdefault(child["masterid"], child["hamilton"])
+        return [self._job_types.get(job_id) for job_id in job_ids]
+
     @staticmethod
     def _alloy_sql(el):
         """Convert to SQL search string"""
@@ -43,50 +114,435 @@ class AtomisticsReasoner:
             return "%"
         return f"%{el}%"
 
+    def _query_jobs(
+        self,
+        outputs: list[onto.Output],
+        project: pyiron_atomistics.Project,
+        select_alloy: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Find the jobs of all the functions producing any of the given outputs at
+        once.
+        """
+        columns = ["id", "chemicalformula", "hamilton", "status"]
+        hamiltons = list(
+            dict.fromkeys(
+                out.output_of.pyiron_name
+                for out in outputs
+                if getattr(out.output_of, "pyiron_name", None) is not None
+            )
+        )
+        if len(hamiltons) == 0:
+            # Only functions with a pyiron name can be found in the database
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(
+            project.db.get_items_dict(
+                {
+                    "hamilton": hamiltons[0] if len(hamiltons) == 1 else hamiltons,
+                    "chemicalformula": self._alloy_sql(select_alloy),
+                    "project": f"%{project.path}%",
+                }
+            ),
+            columns=columns,
+        )
+
+    def _read_jobs(
+        self,
+        project: pyiron_atomistics.Project,
+        job_ids: list[int],
+        hdf_paths: list[list[str]],
+        engines: list[Optional[str]],
+        pool: ThreadPoolExecutor,
+    ) -> list[tuple[list, str]]:
+        """
+        Read values from the HDF files of jobs, with a pool of threads since most of
+        the time goes to waiting for the file system.
+
+        Args:
+            project (pyiron_atomistics.Project): The project to inspect jobs with.
+            job_ids (list[int]): The jobs to read.
+            hdf_paths (list[list[str]]): The paths to read, for each job.
+            engines (list[str | None]): The engine of each job, where known already.
+                The rest are read from the jobs too.
+            pool (ThreadPoolExecutor): The threads to read with.
+
+        Returns:
+            (list[tuple[list, str]]): The values read and the engine, for each job.
+        """
+
+        def read(job_id, paths, engine):
+            job_hdf = project.inspect(job_id)
+            if engine is None:
+                engine = self._job_types[job_id] = self._get_job_type(job_hdf)
+            return [job_hdf[path] for path in paths], engine
+
+        return list(pool.map(read, job_ids, hdf_paths, engines))
+
+    @staticmethod
+    def _cache_key(
+        properties: list[onto.Generic],
+        project: pyiron_atomistics.Project,
+        select_alloy: Optional[str] = None,
+    ) -> tuple:
+        # Properties are usually fresh individuals, so they are known by their classes
+        classes = tuple(
+            tuple(sorted(c.iri for c in p.is_a if hasattr(c, "iri")))
+            for p in properties
+        )
+        return classes, str(project.path), select_alloy
+
+    def _load_cache(self, cache_key: tuple, job_ids: list[int]) -> dict:
+        if self.cache is None:
+            return {}
+        # Forget jobs which have since been removed
+        found = set(job_ids)
+        return {
+            job_id: entry
+            for job_id, entry in self.cache.load(*cache_key).items()
+            if job_id in found
+        }
+
+    def _store_cache(self, cache_key: tuple, cached: dict) -> None:
+        if self.cache is not None:
+            self.cache.store(cached, *cache_key)
+
+    def _read_rows(
+        self,
+        project: pyiron_atomistics.Project,
+        jobs: dict[str, list],
+        paths: dict[int, list[str]],
+        pool: ThreadPoolExecutor,
+        cached: dict,
+    ) -> tuple[dict[int, tuple[dict[str, object], str]], bool]:
+        """
+        Get values for jobs from the cache where their status is unchanged, and
+        otherwise read each job once for all its paths.
+
+        Args:
+            project (pyiron_atomistics.Project): The project to inspect jobs with.
+            jobs (dict[str, list]): The columns of the database query.
+            paths (dict[int, list[str]]): The HDF paths needed, by database row.
+            pool (ThreadPoolExecutor): The threads to read with.
+            cached (dict): The cache entries of this search, updated in place.
+
+        Returns:
+            (dict[int, tuple[dict[str, object], str]]): The values by path, and the
+                engine, by database row.
+            (bool): Whether any job had to be read, i.e. the cache entries changed.
+        """
+        job_ids, hamiltons, statuses = jobs["id"], jobs["hamilton"], jobs["status"]
+        read, to_read = {}, {}
+        for i, job_paths in paths.items():
+            status, engine, values = cached.get(job_ids[i], (None, None, {}))
+            if status == statuses[i] and all(p in values for p in job_paths):
+                read[i] = (values, engine)
+            else:
+                to_read[i] = list(job_paths)
+        for (i, job_paths), (values, engine) in zip(
+            to_read.items(),
+            self._read_jobs(
+                project,
+                [job_ids[i] for i in to_read],
+                list(to_read.values()),
+                self._get_job_types(
+                    project,
+                    [job_ids[i] for i in to_read],
+                    [hamiltons[i] for i in to_read],
+                ),
+                pool,
+            ),
+        ):
+            read[i] = (dict(zip(job_paths, values)), engine)
+            cached[job_ids[i]] = (statuses[i], engine, read[i][0])
+        return read, len(to_read) > 0
+
+    @staticmethod
+    def _to_column(
+        values: list, units: list[Optional[str]], target_unit: Optional[str] = None
+    ) -> tuple[np.ndarray | list, list[Optional[str]]]:
+        """
+        Make a column of numbers a numpy array, and convert the values to a target
+        unit, a whole group of values with the same unit at a time.
+
+        Args:
+            values (list): The values.
+            units (list[str | None]): The unit of each value.
+            target_unit (str | None): The unit to convert to. (Default is None, don't
+                convert.)
+
+        Returns:
+            (numpy.ndarray | list, list[str | None]): The values (as an array unless
+                any are not numbers) and their units.
+
+        Raises:
+            (ValueError): If converting values which have no unit.
+        """
+        numeric = all(isinstance(v, Number) for v in values)
+        column = np.asarray(values) if numeric else list(values)
+        if target_unit is None:
+            return column, units
+
+        if numeric:
+            column = column.astype(float)
+        units = np.asarray(units, dtype=object)
+        for unit in dict.fromkeys(units):
+            rows = np.flatnonzero(units == unit)
+            if unit is None:
+                if not all(pd.isna(column[i]) for i in rows):
+                    raise ValueError("Parameters must have a unit specified")
+            elif numeric:
+                column[rows] = (
+                    UREG.Quantity(column[rows], unit).to(target_unit).magnitude
+                )
+            else:
+                quantity = UREG.Quantity(1, unit)
+                for i in rows:
+                    column[i] = (column[i] * quantity).to(target_unit).magnitude
+        return column, [None if u is None else target_unit for u in units]
+
+    @staticmethod
+    def _get_header(my_property: onto.Generic) -> list[str]:
+        return ["Chemical Formula", f"{my_property.__class__}", "unit", "Engine"]
+
+    def iter_database_for_property(
+        self,
+        my_property: onto.Generic,
+        project: pyiron_atomistics.Project,
+        select_alloy: Optional[str] = None,
+        chunk_size: Optional[int] = 1000,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        max_workers: int = 8,
+        target_unit: Optional[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Like :meth:`search_database_for_property`, but yielding the results in
+        chunks as soon as their jobs are read, so only one chunk is held at a time.
+
+        The rows are indexed by their position in the full search results, so the
+        chunks of a search can simply be concatenated.
+
+        Args:
+            my_property (onto.Generic): The property to search for.
+            project (pyiron_atomistics.Project): The project to search in.
+            select_alloy (str | None): An element the chemical formula must contain.
+                (Default is None, don't filter.)
+            chunk_size (int | None): The most rows to yield at once. (Default is
+                1000, None gives everything in one chunk.)
+            limit (int | None): The most rows to yield in total. (Default is None,
+                no limit.)
+            offset (int): How many rows to skip from the start. (Default is 0.)
+            max_workers (int): The most job HDF files to read at once. (Default is
+                8.)
+            target_unit (str | None): The unit to convert the values to. (Default is
+                None, leave them in the unit of the output they come from.)
+
+        Yields:
+            (pandas.DataFrame): The chemical formula, property value, unit and engine
+                of the jobs found.
+        """
+        outputs = my_property.indirect_outputs
+        if len(outputs) == 0:
+            return
+        property_column = self._get_header(my_property)[1]
+
+        jobs = self._query_jobs(outputs, project, select_alloy=select_alloy).to_dict(
+            orient="list"
+        )
+        # Rows go output by output, and in database order within each output
+        rows = [
+            (out, i)
+            for out in outputs
+            for i, hamilton in enumerate(jobs["hamilton"])
+            if hamilton == out.output_of.pyiron_name
+        ]
+        stop = len(rows) if limit is None else min(len(rows), offset + limit)
+        if stop <= offset:
+            return
+        step = stop - offset if chunk_size is None else chunk_size
+
+        cache_key = self._cache_key([my_property], project, select_alloy)
+        cached = self._load_cache(cache_key, jobs["id"])
+        updated = False
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, step))) as pool:
+            try:
+                for start in range(offset, stop, step):
+                    chunk = rows[start : min(start + step, stop)]
+                    # Each job is read once for all the outputs it gives rows for
+                    paths = {}
+                    for out, i in chunk:
+                        paths.setdefault(i, {})[out.hdf_path] = None
+                    read, changed = self._read_rows(project, jobs, paths, pool, cached)
+                    updated |= changed
+                    values, units = self._to_column(
+                        [read[i][0][out.hdf_path] for out, i in chunk],
+                        [out.unit for out, _ in chunk],
+                        target_unit=target_unit,
+                    )
+                    yield pd.DataFrame(
+                        {
+                            "Chemical Formula": [
+                                jobs["chemicalformula"][i] for _, i in chunk
+                            ],
+                            property_column: values,
+                            "unit": units,
+                            "Engine": [read[i][1] for _, i in chunk],
+                        },
+                        index=pd.RangeIndex(start, start + len(chunk)),
+                    )
+            finally:
+                # Also keep what was read when the iteration is stopped early
+                if updated:
+                    self._store_cache(cache_key, cached)
+
     def search_database_for_property(
         self,
         my_property: onto.Generic,
         project: pyiron_atomistics.Project,
         select_alloy: Optional[str] = None,
-    ):
+        limit: Optional[int] = None,
+        offset: int = 0,
+        max_workers: int = 8,
+        target_unit: Optional[str] = None,
+    ) -> pd.DataFrame:
         """
         Use the pyiron database to search for instances of an ontological generic
         parameter. Optionally filter by the chemistry of the job.
 
+        All the outputs the property can come from are searched for with a single
+        database query, and the job HDF files are read in parallel.
+
         Args:
-            my_property:
-            project:
-            select_alloy:
+            my_property (onto.Generic): The property to search for.
+            project (pyiron_atomistics.Project): The project to search in.
+            select_alloy (str | None): An element the chemical formula must contain.
+                (Default is None, don't filter.)
+            limit (int | None): The most rows to give. (Default is None, no limit.)
+            offset (int): How many rows to skip from the start. (Default is 0.)
+            max_workers (int): The most job HDF files to read at once. (Default is
+                8.)
+            target_unit (str | None): The unit to convert the values to. (Default is
+                None, leave them in the unit of the output they come from.)
 
         Returns:
+            (pandas.DataFrame): The chemical formula, property value, unit and engine
+                of each job found (one row per output the property comes from).
+        """
+        frames = list(
+            self.iter_database_for_property(
+                my_property,
+                project,
+                select_alloy=select_alloy,
+                chunk_size=None,
+                limit=limit,
+                offset=offset,
+                max_workers=max_workers,
+                target_unit=target_unit,
+            )
+        )
+        return (
+            frames[0]
+            if len(frames) > 0
+            else pd.DataFrame(columns=self._get_header(my_property))
+        )
 
+    def search_database_for_properties(
+        self,
+        properties: list[onto.Generic],
+        project: pyiron_atomistics.Project,
+        select_alloy: Optional[str] = None,
+        max_workers: int = 8,
+        target_units: Optional[list[Optional[str]]] = None,
+    ) -> pd.DataFrame:
         """
-        pd_header = [
-            "Chemical Formula",
-            f"{my_property.__class__}",
-            "unit",
-            "Engine",
+        Use the pyiron database to search for several ontological generic parameters
+        at once, joined into one row per job.
+
+        The outputs giving the properties are grouped by the function producing them,
+        so all the jobs are found with a single database query and each job HDF file
+        is read once for all the properties it has.
+
+        Args:
+            properties (list[onto.Generic]): The properties to search for.
+            project (pyiron_atomistics.Project): The project to search in.
+            select_alloy (str | None): An element the chemical formula must contain.
+                (Default is None, don't filter.)
+            max_workers (int): The most job HDF files to read at once. (Default is
+                8.)
+            target_units (list[str | None] | None): The unit to convert the values
+                of each property to. (Default is None, leave them all in the unit of
+                the output they come from.)
+
+        Returns:
+            (pandas.DataFrame): Indexed by job id, the chemical formula and engine of
+                each job giving any of the properties, and the value and unit of each
+                property (missing where the job doesn't give that property). Where a
+                function gives a property as several outputs, each of those gets its
+                own value and unit columns, named `"<property> [<output name>]"`.
+        """
+        if target_units is None:
+            target_units = [None] * len(properties)
+        # The target unit of each value column
+        value_columns = {}
+        # The output giving each value column, by the name of the function producing it
+        outputs_by_hamilton = {}
+        for my_property, target_unit in zip(properties, target_units):
+            column = f"{my_property.__class__}"
+            if column in value_columns:
+                continue  # Properties of the same class give the same columns
+            value_columns[column] = target_unit
+            by_hamilton = {}
+            for out in my_property.indirect_outputs:
+                hamilton = getattr(out.output_of, "pyiron_name", None)
+                if hamilton is not None:  # Others can't be found in the database
+                    by_hamilton.setdefault(hamilton, []).append(out)
+            for hamilton, hamilton_outputs in by_hamilton.items():
+                for out in hamilton_outputs:
+                    key = (
+                        column
+                        if len(hamilton_outputs) == 1
+                        else f"{column} [{out.name}]"
+                    )
+                    value_columns.setdefault(key, target_unit)
+                    outputs_by_hamilton.setdefault(hamilton, {})[key] = out
+        header = ["Chemical Formula", "Engine"] + [
+            c for column in value_columns for c in (column, f"{column} unit")
         ]
-        pd_dic = {k: [] for k in pd_header}
-
-        for specific_property in my_property.indirect_outputs:
-            property_hdf_path = specific_property.hdf_path
-            df_murn = pd.DataFrame(
-                project.db.get_items_dict(
-                    {
-                        "hamilton": specific_property.output_of.pyiron_name,
-                        "chemicalformula": self._alloy_sql(select_alloy),
-                        "project": f"%{project.path}%",
-                    }
-                )
-            )
+        outputs = [
+            out for found in outputs_by_hamilton.values() for out in found.values()
+        ]
+        if len(outputs) == 0:
+            return pd.DataFrame(columns=header, index=pd.Index([], name="id"))
 
-            for _, row in df_murn.iterrows():
-                job_hdf = project.inspect(row.id)
-                pd_dic["Chemical Formula"].append(row.chemicalformula)
-                output_property = job_hdf[property_hdf_path]
-                value = output_property
-                pd_dic[pd_header[1]].append(value)
-                pd_dic["unit"].append(specific_property.unit)
-                pd_dic["Engine"].append(self._get_job_type(job_hdf))
-            return pd.DataFrame(pd_dic)
+        jobs = self._query_jobs(outputs, project, select_alloy=select_alloy).to_dict(
+            orient="list"
+        )
+        job_outputs = [outputs_by_hamilton[h] for h in jobs["hamilton"]]
+        paths = {
+            i: list(dict.fromkeys(out.hdf_path for out in found.values()))
+            for i, found in enumerate(job_outputs)
+        }
+        cache_key = self._cache_key(properties, project, select_alloy)
+        cached = self._load_cache(cache_key, jobs["id"])
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(paths)))
+        ) as pool:
+            read, updated = self._read_rows(project, jobs, paths, pool, cached)
+        if updated:
+            self._store_cache(cache_key, cached)
+
+        data = {
+            "Chemical Formula": jobs["chemicalformula"],
+            "Engine": [read[i][1] for i in range(len(job_outputs))],
+        }
+        for column, target_unit in value_columns.items():
+            found = [by_column.get(column) for by_column in job_outputs]
+            data[column], data[f"{column} unit"] = self._to_column(
+                [
+                    np.nan if out is None else read[i][0][out.hdf_path]
+                    for i, out in enumerate(found)
+                ],
+                [None if out is None else out.unit for out in found],
+                target_unit=target_unit,
+            )
+        return pd.DataFrame(data, index=pd.Index(jobs["id"], name="id"), columns=header)
@@ -0,0 +1,215 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+"""
+On-disk caches: of reasoned ontologies, keyed by a fingerprint of their declarations,
+and of the values found by searching pyiron databases.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections import defaultdict
+from io import BytesIO
+
+import owlready2 as owl
+
+from pyiron_ontology.reasoner import apply_inferences
+
+
+def get_triples(
+    onto: owl.Ontology,
+) -> tuple[
+    list[tuple[str | int, str, str | int]],
+    list[tuple[str | int, str, object, str | int]],
+]:
+    """
+    Get all the triples stored for an ontology, with named entities given by their
+    IRI and blank nodes left as their (negative) integer storage id.
+
+    Args:
+        onto (owl.Ontology): The ontology to read.
+
+    Returns:
+        (list, list): The object triples `(s, p, o)` and the data triples
+            `(s, p, value, datatype)`.
+    """
+    world = onto.world
+
+    def iri(storid):
+        return storid if storid < 0 else world._unabbreviate(storid)
+
+    obj_triples = [
+        (iri(s), world._unabbreviate(p), iri(o))
+        for s, p, o in onto.graph._get_obj_triples_spo_spo(None, None, None)
+    ]
+    data_triples = [
+        (
+            iri(s),
+            world._unabbreviate(p),
+            o,
+            world._unabbreviate(d) if isinstance(d, int) and d > 0 else d,
+        )
+        for s, p, o, d in onto.graph._get_data_triples_spod_spod(None, None, None)
+    ]
+    return obj_triples, data_triples
+
+
+def fingerprint(onto: owl.Ontology, **options) -> str:
+    """
+    A hash of everything declared in an ontology, independent of the storage ids the
+    world happened to hand out.
+
+    Blank nodes (restrictions, disjoint axioms, lists, etc.) are rendered by their
+    content, so the same declarations give the same fingerprint in any world.
+
+    Args:
+        onto (owl.Ontology): The ontology to fingerprint.
+        **options: Any other settings that influence the reasoned result (e.g. the
+            arguments passed to the reasoner).
+
+    Returns:
+        (str): The hex digest of the fingerprint.
+    """
+    obj_triples, data_triples = get_triples(onto)
+    statements = defaultdict(list)
+    for s, *statement in obj_triples + data_triples:
+        statements[s].append(statement)
+    referenced = {o for _, _, o in obj_triples if isinstance(o, int)}
+
+    def render(node):
+        if isinstance(node, str):
+            return f"<{node}>"
+        return (
+            "["
+            + "; ".join(sorted(render_statement(*st) for st in statements[node]))
+            + "]"
+        )
+
+    def render_statement(p, o, *d):
+        if d:
+            return f"<{p}> {o!r}^^{d[0]!r}"
+        return f"<{p}> {render(o)}"
+
+    lines = []
+    for s, sts in statements.items():
+        if isinstance(s, str):
+            lines.extend(f"<{s}> {render_statement(*st)}" for st in sts)
+        elif s not in referenced:
+            lines.append(render(s))  # Anonymous axioms, e.g. disjoints
+    lines.sort()
+
+    digest = hashlib.sha256()
+    digest.update(f"owlready2={owl.VERSION}\n".encode())
+    for key in sorted(options):
+        digest.update(f"{key}={options[key]!r}\n".encode())
+    for line in lines:
+        digest.update(line.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class ReasonedCache:
+    """
+    Stores the reasoned state of ontologies as owlready2 SQLite quadstores in a
+    directory, one file per declaration fingerprint.
+
+    On a cache hit, the triples the reasoner added are replayed onto the freshly
+    declared (but not yet reasoned) ontology using the same machinery owlready2 uses
+    to apply reasoner output, so python-side entities are updated as if the reasoner
+    had just run.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, onto: owl.Ontology, key: str) -> str:
+        return os.path.join(self.directory, f"{onto.name}_{key}.sqlite3")
+
+    def store(self, onto: owl.Ontology, key: str) -> None:
+        """Snapshot the (reasoned) ontology to the quadstore for this key."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(onto, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        buffer = BytesIO()
+        onto.save(file=buffer, format="ntriples")
+        buffer.seek(0)
+        world = owl.World(filename=tmp_path)
+        try:
+            world.get_ontology(onto.base_iri).load(fileobj=buffer)
+            world.save()
+        finally:
+            world.close()
+        os.replace(tmp_path, path)
+
+    def load(self, onto: owl.Ontology, key: str) -> bool:
+        """
+        Replay a cached reasoning result onto the ontology.
+
+        Returns:
+            (bool): Whether there was a cached result for this key.
+        """
+        path = self.path(onto, key)
+        if not os.path.isfile(path):
+            return False
+        world = owl.World(filename=path)
+        try:
+            cached_obj, cached_data = get_triples(world.get_ontology(onto.base_iri))
+        finally:
+            world.close()
+        current_obj, current_data = get_triples(onto)
+        apply_inferences(
+            onto,
+            [
+                (s, p, o)
+                for s, p, o in set(cached_obj).difference(current_obj)
+                if isinstance(s, str) and isinstance(o, str)
+            ],
+            [
+                t
+                for t in set(cached_data).difference(current_data)
+                if isinstance(t[0], str)
+            ],
+        )
+        return True
+
+
+class SearchCache:
+    """
+    Stores the values read from jobs when searching a pyiron database, in a
+    directory, one pickle file per search.
+
+    Each entry maps a job id to the status the job had when it was read, the engine
+    it was run with, and the values read from each HDF path, so that a repeated search
+    only needs to read the jobs which are new or have changed status since.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, *key) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"search_{digest}.pickle")
+
+    def load(self, *key) -> dict[int, tuple[str, str, dict[str, object]]]:
+        """
+        The cached entries for this key.
+
+        Returns:
+            (dict): Job ids mapped to their status, engine, and values by HDF path.
+        """
+        path = self.path(*key)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def store(self, entries: dict[int, tuple[str, str, dict[str, object]]], *key):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(*key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entries, f)
+        os.replace(tmp_path, path)
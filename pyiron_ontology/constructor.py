@@ -7,32 +7,80 @@ A parent class for the constructors of all pyiron ontologies.
 
 from __future__ import annotations
 
+import multiprocessing
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
 from typing import Optional
 from warnings import warn
 
 import owlready2 as owl
 import pint
 
-from pyiron_ontology.workflow import NodeTree
+from pyiron_ontology.cache import ReasonedCache, fingerprint
+from pyiron_ontology.graph import CompiledGraph
+from pyiron_ontology.index import ClassIndex, IOIndex
+from pyiron_ontology.reasoner import (
+    ReasonerSession,
+    StructuralReasoner,
+    apply_inferences,
+    extract_axioms,
+)
+from pyiron_ontology.workflow import (
+    CompactNode,
+    CompactTree,
+    LazyNodeTree,
+    NodeTree,
+    NodeTreeBuilder,
+    SourceNode,
+)
 
 UREG = pint.UnitRegistry()
 
+_worker_expansion = None
+
+
+def _set_worker_expansion(expansion):
+    global _worker_expansion
+    _worker_expansion = expansion
+
+
+def _expand_in_worker(task):
+    return _worker_expansion(*task)
+
 
 class Constructor:
+    reasoners = ("pellet", "structural")
+    requirements_memo_size = 4096
+
     def __init__(
         self,
         name: str,
         closed: bool = True,
         strict: bool = False,
         debug: int = 0,
+        cache_dir: Optional[str] = None,
+        reasoner: str | ReasonerSession = "pellet",
     ):
         onto = owl.get_ontology(f"file://{name}.owl")
         self.onto = onto
+        self.cache = ReasonedCache(cache_dir) if cache_dir is not None else None
+        self.reasoner = reasoner
+        self._reasoner = None
+        self.class_index = ClassIndex()
+        self.io_index = IOIndex(self.class_index)
+        self.graph = None
+        self.version = 0
+        self._function_options = {}
+        self._requirements_memo = None
         self._make_universal_declarations()
         self._make_specific_declarations()
         # TODO: Introduce a "from_csv" option for constructing, and leverage
         #       `all_classes=False` in `declare_classes`?
-        self.sync(closed=closed, strict=strict, debug=debug)
+        self.sync(closed=closed, strict=strict, debug=debug, reasoner=reasoner)
 
     def sync(
         self,
@@ -41,15 +89,175 @@ class Constructor:
         infer_data_property_values=True,
         debug=0,
         strict=True,
+        reasoner: Optional[str | ReasonerSession] = None,
     ):
+        """
+        Reason over the ontology.
+
+        Args:
+            closed (bool): Whether to close the world before reasoning.
+            infer_property_values (bool): Whether Pellet should infer object
+                property values.
+            infer_data_property_values (bool): Whether Pellet should infer data
+                property values.
+            debug (int): The owlready2 reasoner debug level.
+            strict (bool): Whether to raise an error (instead of warning) when
+                inconsistent classes are found.
+            reasoner (str | ReasonerSession): Which reasoner to use: "pellet" (needs
+                java) or "structural", a pure-python classifier for the fragment of
+                OWL used by pyiron ontologies. A running `ReasonerSession` can also be
+                passed to use its (structural) reasoner process. (Default is None,
+                use the reasoner the constructor was made with.)
+        """
+        reasoner = self.reasoner if reasoner is None else reasoner
+        if isinstance(reasoner, ReasonerSession):
+            session, reasoner = reasoner, "structural"
+        else:
+            session = None
+        if reasoner not in self.reasoners:
+            raise ValueError(
+                f"Unknown reasoner {reasoner}, please choose from {self.reasoners}"
+            )
         if closed:
             owl.close_world(self.onto.PyObject)
-        with self.onto:
-            owl.sync_reasoner_pellet(
+
+        key = (
+            None
+            if self.cache is None
+            else fingerprint(
+                self.onto,
+                reasoner=reasoner,
                 infer_property_values=infer_property_values,
                 infer_data_property_values=infer_data_property_values,
-                debug=debug,
             )
+        )
+        self._reasoner = None
+        if key is None or not self.cache.load(self.onto, key):
+            if session is not None:
+                apply_inferences(
+                    self.onto, session.infer(extract_axioms(self.onto.world))
+                )
+            elif reasoner == "structural":
+                self._reasoner = StructuralReasoner(extract_axioms(self.onto.world))
+                apply_inferences(self.onto, self._reasoner.infer())
+            else:
+                with self.onto:
+                    owl.sync_reasoner_pellet(
+                        infer_property_values=infer_property_values,
+                        infer_data_property_values=infer_data_property_values,
+                        debug=debug,
+                    )
+            if key is not None:
+                self.cache.store(self.onto, key)
+
+        self._build_indices()
+        self._check_consistency(strict)
+
+    def sync_increment(self, *entities: owl.Thing | owl.ThingClass, strict=True):
+        """
+        Reason over newly added individuals and classes without re-classifying the
+        entire ontology.
+
+        The new entities are reasoned about (with the structural reasoner) against
+        the ontology as it was classified by the last sync. Functions bring their
+        inputs and outputs along, and IO brings along its generic and requirements,
+        so e.g. passing just a new `Function` is enough. New entities that change
+        the existing classes (e.g. new disjoints between them) fall back to
+        reasoning over everything.
+
+        Args:
+            *entities (owl.Thing | owl.ThingClass): The new individuals and classes.
+            strict (bool): Whether to raise an error (instead of warning) when
+                inconsistent classes are found.
+        """
+        if self._reasoner is None:
+            self._reasoner = StructuralReasoner(extract_axioms(self.onto.world))
+        entities = self._with_dependents(entities)
+        apply_inferences(
+            self.onto,
+            self._reasoner.infer_increment(extract_axioms(self.onto.world, entities)),
+        )
+        if any(isinstance(entity, owl.ThingClass) for entity in entities):
+            self._build_indices()
+        else:
+            self.io_index.add(*(e for e in entities if isinstance(e, self.onto.IO)))
+            self._bump_version()
+            self._add_to_graph(entities)
+        self._check_consistency(strict)
+
+    def _add_to_graph(self, individuals):
+        """
+        Extend the compiled graph with new individuals, or compile it again if they
+        change what it already knows (i.e. new inputs for known functions).
+        """
+        groups = {
+            cls: [i for i in individuals if isinstance(i, cls)]
+            for cls in [
+                self.onto.Function,
+                self.onto.Input,
+                self.onto.Output,
+                self.onto.Generic,
+            ]
+        }
+        new_functions = set(groups[self.onto.Function])
+        for inp in groups[self.onto.Input]:
+            for function in inp.mandatory_input_of, inp.optional_input_of:
+                if function is not None and function not in new_functions:
+                    self.compile()
+                    return
+        try:
+            self.graph.add(*groups.values())
+        except KeyError:
+            self.compile()  # They refer to something the graph doesn't know about
+
+    def mark_modified(self):
+        """
+        Refresh everything searches pre-compute from the ontology: class and IO
+        indices, the compiled graph, and cached options.
+
+        This happens automatically when syncing, so is only needed after changing
+        already-synced individuals by hand.
+        """
+        self._build_indices()
+
+    def _bump_version(self):
+        self.version += 1  # Invalidates version-tagged caches
+        self._requirements_memo.cache_clear()
+
+    def _build_indices(self):
+        self._bump_version()
+        self.class_index = ClassIndex(self.onto.world.classes())
+        self.io_index = IOIndex(self.class_index, self.onto.IO.instances())
+        self.compile()
+
+    def compile(self):
+        """
+        Take an array-based snapshot of the workflow relations in the ontology for
+        source searches to run on. This happens automatically when syncing, and
+        when searches meet individuals (other than generics, which only get
+        transient ids for the search) that are not in the snapshot yet.
+        """
+        self.graph = CompiledGraph(self.onto, self.class_index)
+
+    def _with_dependents(self, entities):
+        found = set()
+        to_visit = list(entities)
+        while len(to_visit) > 0:
+            entity = to_visit.pop()
+            if entity is None or entity in found:
+                continue
+            found.add(entity)
+            if isinstance(entity, self.onto.Function):
+                to_visit.extend(entity.inputs + entity.outputs)
+            elif isinstance(entity, self.onto.IO):
+                to_visit.extend(
+                    [entity.generic]
+                    + entity.requirements
+                    + entity.transitive_requirements
+                )
+        return found
+
+    def _check_consistency(self, strict):
         inconsistent = list(self.onto.inconsistent_classes())
         if len(inconsistent) > 0:
             msg = f"Inconsistent classes were found in the ontology: {inconsistent}"
@@ -58,6 +266,112 @@ class Constructor:
             else:
                 warn(msg)
 
+    def get_reachable_outputs(self, *available: owl.Thing) -> list[owl.Thing]:
+        """
+        Find everything that can be computed from what is already available.
+
+        Outputs whose functions have all their mandatory inputs fed are found by
+        chaining forward from what's available (and from functions which need no
+        input), so only the reachable part of the ontology is visited. Since the
+        requirements an input passes upstream only become known when searching
+        backwards, each of these candidates is then confirmed by a backwards search
+        that only considers other candidates and what is available.
+
+        Args:
+            *available (owl.Thing): `Generic` individuals we have, and/or `Output`
+                individuals we can already produce.
+
+        Returns:
+            (list[Output]): The outputs that can be produced.
+        """
+        index = self.class_index
+        generics = [a for a in available if isinstance(a, self.onto.Generic)]
+        outputs = [a for a in available if isinstance(a, self.onto.Output)]
+
+        def generic_fits(generic, inp, requirements):
+            # Like an output would be, see `Input.get_sources`, `Output.satisfies`
+            things, disjoints = index.representation_masks(generic)
+            return index.mask(
+                self.onto.Generic.only_get_thing_classes(inp.generic.is_a)
+            ) & things and all(
+                index.compatible(things, disjoints, *index.representation_masks(r))
+                for r in requirements
+            )
+
+        # Forward, ignoring requirements that are passed upstream
+        candidates = {}
+        fed = set()
+        to_feed = []
+        for generic in generics:
+            things, _ = index.representation_masks(generic)
+            for inp in self.io_index.get_consumers(things):
+                if generic_fits(generic, inp, inp.get_requirements()):
+                    to_feed.append(inp)
+        to_produce = outputs + self.io_index.unconditional_outputs
+        while len(to_produce) > 0 or len(to_feed) > 0:
+            while len(to_produce) > 0:
+                output = to_produce.pop()
+                if output in candidates:
+                    continue
+                candidates[output] = None
+                things, _ = index.representation_masks(output.generic)
+                to_feed.extend(
+                    inp
+                    for inp in self.io_index.get_consumers(things)
+                    if inp not in fed and output in inp.get_sources()
+                )
+            while len(to_feed) > 0:
+                inp = to_feed.pop()
+                if inp in fed:
+                    continue
+                fed.add(inp)
+                function = inp.mandatory_input_of
+                if all(i in fed for i in function.mandatory_inputs):
+                    to_produce.extend(function.outputs)
+
+        # Backward, with the requirements
+        producible = {}
+        cycles_hit = [0]  # Failures due to cycles depend on the path, don't memoize
+
+        def can_produce(parameter, requirements, path):
+            if parameter in outputs:
+                return True
+            key = (parameter, None if requirements is None else tuple(requirements))
+            if key in producible:
+                return producible[key]
+            if parameter in path:
+                cycles_hit[0] += 1
+                return False
+            path = path.union([parameter])
+            n_cycles_hit = cycles_hit[0]
+
+            if isinstance(parameter, self.onto.Output):
+                found = can_produce(parameter.output_of, requirements, path)
+            elif isinstance(parameter, self.onto.Function):
+                found = all(
+                    can_produce(inp, requirements, path)
+                    for inp in parameter.mandatory_inputs
+                )
+            else:
+                sources, passed = parameter.get_sources_and_passed_requirements(
+                    additional_requirements=requirements
+                )
+                found = any(
+                    generic_fits(generic, parameter, passed) for generic in generics
+                ) or any(
+                    can_produce(source, passed, path)
+                    for source in sources
+                    if source in candidates
+                )
+
+            if found or cycles_hit[0] == n_cycles_hit:
+                producible[key] = found
+            return found
+
+        return [
+            output for output in candidates if can_produce(output, None, frozenset())
+        ]
+
     def save(self):
         self.onto.save()
 
@@ -65,6 +379,8 @@ class Constructor:
         pass
 
     def _make_universal_declarations(self):
+        constructor = self
+
         with self.onto:
 
             class PyironOntoThing(owl.Thing):
@@ -73,8 +389,109 @@ class Constructor:
                 ) -> list[WorkflowThing]:
                     raise NotImplementedError
 
-                def get_source_tree(self, additional_requirements=None):
+                def get_source_tree(
+                    self,
+                    additional_requirements=None,
+                    lazy: bool = False,
+                    max_depth: Optional[int] = None,
+                    max_nodes: Optional[int] = None,
+                    timeout: Optional[float] = None,
+                    max_workers: Optional[int] = None,
+                    compact: bool = False,
+                ):
+                    """
+                    The tree of all the ways to get this individual.
+
+                    Individuals that would be their own source (i.e. cycles in the
+                    ontology) are not searched again. When the search runs out of any
+                    of its budgets, what was found so far is returned, and the nodes
+                    whose search was cut short (and all their parents) are flagged as
+                    `truncated`.
+
+                    Args:
+                        additional_requirements (list[Generic] | None): Extra
+                            requirements the sources need to satisfy.
+                        lazy (bool): Whether to only search for the sources of each
+                            node the first time its children are accessed. Nodes
+                            are then flagged as truncated once the search reaches
+                            the cut. (Default is False, search everything right
+                            away.)
+                        max_depth (int | None): How many levels below this one to
+                            search. (Default is None, search all the way up.)
+                        max_nodes (int | None): The most nodes to put in the tree.
+                            Ignored when lazy. (Default is None, no limit.)
+                        timeout (float | None): The most seconds to search for.
+                            Ignored when lazy. (Default is None, no limit.)
+                        max_workers (int | None): How many processes to search
+                            independent parts of the tree with. Ignored when lazy,
+                            and needs processes to be forked (so not on Windows).
+                            In parallel, `max_nodes` is split up evenly between the
+                            parts. (Default is None, search in this process.)
+                        compact (bool): Whether to store the tree in arrays (a
+                            `CompactTree`) instead of as one object per node, for
+                            very large trees. Ignored when lazy. The returned root
+                            navigates the same way. (Default is False.)
+
+                    Returns:
+                        (NodeTree | CompactNode): The source tree.
+                    """
+                    if lazy:
+                        return build_lazy_tree(
+                            self,
+                            additional_requirements=additional_requirements,
+                            max_depth=max_depth,
+                        )
                     return build_tree(
+                        self,
+                        additional_requirements=additional_requirements,
+                        max_depth=max_depth,
+                        max_nodes=max_nodes,
+                        timeout=timeout,
+                        max_workers=max_workers,
+                        compact=compact,
+                    )
+
+                def iter_workflows(
+                    self, additional_requirements=None, limit: Optional[int] = None
+                ):
+                    """
+                    Go through the complete workflows that give this individual one
+                    at a time, i.e. the source trees where a single source is chosen
+                    for each input (and generic), all the way up to inputs without
+                    sources. Inputs whose only sources lead back around a cycle have
+                    no complete workflow.
+
+                    Workflows are generated as they are needed, so the full space of
+                    combinations is never held in memory.
+
+                    Args:
+                        additional_requirements (list[Generic] | None): Extra
+                            requirements the sources need to satisfy.
+                        limit (int | None): The most workflows to give. (Default is
+                            None, give them all.)
+
+                    Yields:
+                        (NodeTree): A source tree with at most one child per input.
+                    """
+                    workflows = iterate_workflows(
+                        build_graph(
+                            self, additional_requirements=additional_requirements
+                        )
+                    )
+                    for workflow in islice(workflows, limit):
+                        yield workflow_to_tree(workflow)
+
+                def get_source_graph(self, additional_requirements=None):
+                    """
+                    Like the source tree, but where the search for the sources of
+                    the same individual under the same requirements is done only
+                    once and the resulting node shared by everything using it.
+
+                    Returns:
+                        (SourceNode): The root of the graph, which can be expanded
+                            to the source tree with `.to_tree()`.
+                    """
+                    return build_graph(
                         self, additional_requirements=additional_requirements
                     )
 
@@ -120,13 +537,9 @@ class Constructor:
 
                 @property
                 def indirect_io(self) -> list[Parameter]:
-                    generic_classes = self.only_get_thing_classes(self.is_a)
-                    unique_instances = list(
-                        set(generic_classes[0].instances()).union(
-                            *[gc.instances() for gc in generic_classes[1:]]
-                        )
+                    return constructor.io_index.get(
+                        self.only_get_thing_classes(self.is_a)
                     )
-                    return [p for ui in unique_instances for p in ui.parameters]
 
                 @property
                 def indirect_outputs(self) -> list[Output]:
@@ -145,9 +558,9 @@ class Constructor:
                     Returns:
                         list, set: indirect things, indirect disjoints
                     """
-                    indirect_things = self.indirect_things
-                    indirect_disjoints = get_disjoints_set(indirect_things)
-                    return indirect_things, indirect_disjoints
+                    index = constructor.class_index
+                    things, disjoints = index.representation_masks(self)
+                    return index.classes_in(things), set(index.classes_in(disjoints))
 
                 @classmethod
                 def class_is_indirectly_disjoint_with(cls, other: owl.ThingClass):
@@ -186,13 +599,7 @@ class Constructor:
 
                 @property
                 def options(self):
-                    return [
-                        opt
-                        for inp in self.inputs
-                        for opt in [inp.generic]
-                        + inp.requirements
-                        + inp.transitive_requirements
-                    ]
+                    return list(get_options(self)[0])
 
             class IO(Parameter, WorkflowThing):
                 pass
@@ -218,13 +625,16 @@ class Constructor:
                     return self.output_of.options
 
                 def satisfies(self, requirements: list[Generic]) -> bool:
-                    others_info = [
-                        other.representation_info
-                        for other in self.options + [self.generic]
+                    index = constructor.class_index
+                    others_masks = get_options(self.output_of)[1] + [
+                        index.representation_masks(self.generic)
                     ]
                     return all(
-                        requirement.has_a_representation_among_others(others_info)
-                        for requirement in requirements
+                        any(
+                            index.compatible(*index.representation_masks(req), *other)
+                            for other in others_masks
+                        )
+                        for req in requirements
                     )
 
             class is_output_of(Output >> Function, owl.FunctionalProperty):
@@ -261,43 +671,19 @@ class Constructor:
                     (discarding the original if in the generic class or requirements,
                     appending if it's a transitive requirement that we're actually
                     receiving).
-                    """
-                    if additional_requirements is None:
-                        return [self.generic] + self.requirements
-                    requirements = [self.generic] + self.requirements
-
-                    base_infos = [other.representation_info for other in requirements]
-                    transitive_infos = [
-                        other.representation_info
-                        for other in self.transitive_requirements
-                    ]
 
-                    for add_req in additional_requirements:
-                        add_things, add_disjoints = add_req.representation_info
-                        used = False  # For early breaking if we use the additional req
-                        for i, (base_things, base_disjoints) in enumerate(base_infos):
-                            if self.candidate_is_as_or_more_specific_than(
-                                add_things, base_disjoints, base_things
-                            ):
-                                requirements[i] = add_req  # Overwrite the thing you're
-                                # more specific than
-                                used = True
-                                break
-                        if used:
-                            continue
-
-                        for trans_things, trans_disjoints in transitive_infos:
-                            # If you haven't found the additional requirement yet,
-                            # check if it's in the allowed transitive requirements
-                            if compatible_classes(
-                                add_things,
-                                add_disjoints,
-                                trans_things,
-                                trans_disjoints,
-                            ):
-                                requirements.append(add_req)
-                                break
-                    return requirements
+                    Results are memoized until the ontology is modified.
+                    """
+                    return list(
+                        constructor._requirements_memo(
+                            self,
+                            (
+                                None
+                                if additional_requirements is None
+                                else tuple(additional_requirements)
+                            ),
+                        )
+                    )
 
                 @staticmethod
                 def candidate_is_as_or_more_specific_than(
@@ -343,6 +729,75 @@ class Constructor:
             owl.AllDisjoint([is_optional_input_of, is_mandatory_input_of])
             owl.AllDisjoint([Input, Function, Output, Generic])
 
+        def merge_requirements(inp: Input, additional_requirements: Optional[tuple]):
+            if additional_requirements is None:
+                return [inp.generic] + inp.requirements
+            requirements = [inp.generic] + inp.requirements
+
+            index = constructor.class_index
+            base_masks = [index.representation_masks(r) for r in requirements]
+            transitive_masks = [
+                index.representation_masks(other)
+                for other in inp.transitive_requirements
+            ]
+
+            for add_req in additional_requirements:
+                add_things, add_disjoints = index.representation_masks(add_req)
+                used = False  # For early breaking if we use the additional req
+                for i, (base_things, base_disjoints) in enumerate(base_masks):
+                    if index.as_or_more_specific(
+                        add_things, base_things, base_disjoints
+                    ):
+                        requirements[i] = add_req  # Overwrite the thing you're
+                        # more specific than
+                        used = True
+                        break
+                if used:
+                    continue
+
+                for trans_things, trans_disjoints in transitive_masks:
+                    # If you haven't found the additional requirement yet,
+                    # check if it's in the allowed transitive requirements
+                    if index.compatible(
+                        add_things,
+                        add_disjoints,
+                        trans_things,
+                        trans_disjoints,
+                    ):
+                        requirements.append(add_req)
+                        break
+            return requirements
+
+        self._requirements_memo = lru_cache(maxsize=self.requirements_memo_size)(
+            merge_requirements
+        )
+
+        def get_options(function: Function):
+            """
+            The options of a function and their `(things, disjoints)` bitsets, cached
+            until the ontology version changes.
+            """
+            try:
+                version, options, masks = constructor._function_options[function]
+                if version == constructor.version:
+                    return options, masks
+            except KeyError:
+                pass
+            options = [
+                opt
+                for inp in function.inputs
+                for opt in [inp.generic]
+                + inp.requirements
+                + inp.transitive_requirements
+            ]
+            masks = [constructor.class_index.representation_masks(o) for o in options]
+            constructor._function_options[function] = (
+                constructor.version,
+                options,
+                masks,
+            )
+            return options, masks
+
         def compatible_classes(
             things1: list[owl.ThingClass],
             disjoints1: set[owl.ThingClass],
@@ -376,45 +831,357 @@ class Constructor:
             For a list of things, get the set of all the things they're disjoint
             to
             """
-            disjoints = []
-            for thing in classes:
-                if thing == owl.Thing:
-                    continue
-                try:
-                    entities = list(next(thing.disjoints()).entities)
-                    # The entities are the actual classes that are disjoint
-                    # The entities for each of the disjoints are ideantical,
-                    # so we can just use `next` to grab the first one
-                    entities.remove(thing)
-                    # The entities of our disjoint include us, so remove us
-                    disjoints += entities
-                except StopIteration:
-                    # If the disjoints are empty, just continue
-                    continue
-            return set(disjoints)
+            index = constructor.class_index
+            return set(index.classes_in(index.disjoint_mask(index.mask(classes))))
 
         def build_tree(
-            parameter, parent=None, additional_requirements=None
-        ) -> NodeTree:
-            node = NodeTree(parameter, parent=parent)
+            parameter,
+            parent=None,
+            additional_requirements=None,
+            max_depth=None,
+            max_nodes=None,
+            timeout=None,
+            max_workers=None,
+            compact=False,
+        ) -> NodeTree | CompactNode:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            with to_ids(parameter, additional_requirements) as (i, requirements):
+                graph = constructor.graph
+                if compact:
+                    builder = CompactTree(graph.lookup(i))
+                    root = builder.add(i)
+                else:
+                    builder = NodeTreeBuilder(graph.individuals)
+                    root = NodeTree(parameter, parent=parent)
+                # Nodes to expand, with the graph id of their value, the requirements to
+                # search by, their depth and the ids of the individuals above them
+                to_expand = [(root, i, requirements, 0, frozenset([i]))]
+                if max_workers is None:
+                    expand_tree(
+                        builder,
+                        to_expand,
+                        max_depth=max_depth,
+                        max_nodes=max_nodes,
+                        deadline=deadline,
+                    )
+                else:
+                    expand_tree_in_parallel(
+                        builder,
+                        to_expand,
+                        max_workers,
+                        max_depth=max_depth,
+                        max_nodes=max_nodes,
+                        deadline=deadline,
+                    )
+                return builder.finalize().root if compact else root
+
+        @contextmanager
+        def to_ids(parameter, requirements=None):
+            """
+            The compiled graph ids of an individual and its requirements for the
+            duration of a search, compiling the graph again if they are not in it yet.
+            Generics the graph doesn't know (e.g. requirements made on the fly) only
+            get transient ids, so throwaway individuals don't pile up in the graph.
+            """
+            unknown = [
+                individual
+                for individual in dict.fromkeys([parameter, *(requirements or [])])
+                if individual not in constructor.graph.ids
+            ]
+            if not all(isinstance(individual, Generic) for individual in unknown):
+                constructor.compile()
+                unknown = [u for u in unknown if u not in constructor.graph.ids]
+            graph = constructor.graph
+            with graph.transient(unknown) as transient_ids:
+                ids = dict(zip(unknown, transient_ids))
+                ids.update(
+                    (individual, graph.ids[individual])
+                    for individual in (parameter, *(requirements or []))
+                    if individual not in ids
+                )
+                yield (
+                    ids[parameter],
+                    None if requirements is None else [ids[r] for r in requirements],
+                )
+
+        def expand_tree(
+            builder, to_expand, max_depth=None, max_nodes=None, deadline=None, n_nodes=1
+        ) -> int:
+            """
+            Expand nodes depth-first until everything is searched or a budget runs
+            out.
 
-            if isinstance(parameter, Input):
+            Args:
+                builder (NodeTreeBuilder | CompactTree): What grows the tree.
+                to_expand (list[tuple]): The nodes to start from.
+
+            Returns:
+                (int): The number of nodes in the tree.
+            """
+            searches = {}  # Each distinct search is only done once
+            while len(to_expand) > 0:
+                if deadline is not None and time.monotonic() > deadline:
+                    for node, *_ in to_expand:
+                        builder.truncate(node)
+                    break
+                children = expand_node(
+                    builder,
+                    *to_expand.pop(),
+                    searches,
+                    max_depth=max_depth,
+                    max_children=None if max_nodes is None else max_nodes - n_nodes,
+                )
+                n_nodes += len(children)
+                to_expand.extend(children)
+            return n_nodes
+
+        def expand_node(
+            builder,
+            node,
+            i,
+            requirements,
+            depth,
+            path,
+            searches,
+            max_depth=None,
+            max_children=None,
+        ) -> list[tuple]:
+            """Give a node its children, and return them for further expansion."""
+            key = (i, requirements_key(requirements))
+            try:
+                sources, requirements = searches[key]
+            except KeyError:
+                sources, requirements = constructor.graph.get_sources_and_requirements(
+                    i, requirements
+                )
+                searches[key] = sources, requirements
+            sources = [s for s in sources if s not in path]  # Break cycles
+
+            if max_depth is not None and depth >= max_depth:
+                if len(sources) > 0:
+                    builder.truncate(node)
+                return []
+            if max_children is not None and len(sources) > max_children:
+                sources = sources[: max(max_children, 0)]
+                builder.truncate(node)
+            return [
                 (
-                    sources,
-                    additional_requirements,
-                ) = parameter.get_sources_and_passed_requirements(
-                    additional_requirements=additional_requirements
-                )  # Snag the accepted transitive requirements as well
-            else:
-                sources = parameter.get_sources(
-                    additional_requirements=additional_requirements
+                    builder.add(source, node),
+                    source,
+                    requirements,
+                    depth + 1,
+                    path.union([source]),
                 )
+                for source in sources
+            ]
+
+        def expand_tree_in_parallel(
+            builder,
+            to_expand,
+            max_workers,
+            max_depth=None,
+            max_nodes=None,
+            deadline=None,
+        ):
+            """
+            Expand nodes breadth-first until there are independent subtrees for each
+            worker, then expand those subtrees in a pool of worker processes and
+            graft the results back on.
 
-            for source in sources:
-                build_tree(
-                    source, parent=node, additional_requirements=additional_requirements
+            The workers are forked from this process, so they share (a copy-on-write
+            snapshot of) the reasoned ontology and its compiled graph, and
+            individuals are passed back and forth by their graph id.
+            """
+            searches = {}
+            n_nodes = len(to_expand)
+            while 0 < len(to_expand) < max_workers:
+                frontier, to_expand = to_expand, []
+                for item in frontier:
+                    children = expand_node(
+                        builder,
+                        *item,
+                        searches,
+                        max_depth=max_depth,
+                        max_children=(
+                            None if max_nodes is None else max_nodes - n_nodes
+                        ),
+                    )
+                    n_nodes += len(children)
+                    to_expand.extend(children)
+            if len(to_expand) == 0:
+                return
+
+            nodes_per_task = (
+                None
+                if max_nodes is None
+                else max(max_nodes - n_nodes, 0) // len(to_expand) + 1
+            )  # Each task starts from a node that is already counted
+            tasks = [
+                (i, requirements, depth, path, max_depth, nodes_per_task, deadline)
+                for _, i, requirements, depth, path in to_expand
+            ]
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_set_worker_expansion,
+                initargs=(expand_subtree,),
+            ) as pool:
+                subtrees = pool.map(_expand_in_worker, tasks)
+                for (node, *_), subtree in zip(to_expand, subtrees):
+                    graft(builder, node, *subtree)
+
+        def expand_subtree(
+            i, requirements, depth, path, max_depth, max_nodes, deadline
+        ):
+            """
+            Returns:
+                (tuple): The graph ids, parent indices (-1 for children of the root)
+                    and truncation of all the nodes below the root, plus the
+                    truncation of the root.
+            """
+            tree = CompactTree(constructor.graph.individuals)
+            expand_tree(
+                tree,
+                [(tree.add(i), i, requirements, depth, path)],
+                max_depth=max_depth,
+                max_nodes=max_nodes,
+                deadline=deadline,
+            )
+            return (
+                tree.values[1:],
+                array("i", (p - 1 for p in tree.parents[1:])),
+                tree.truncated[1:],
+                bool(tree.truncated[0]),
+            )
+
+        def graft(builder, root, ids, parents, truncated, root_truncated):
+            nodes = []
+            for i, parent, is_truncated in zip(ids, parents, truncated):
+                node = builder.add(i, root if parent < 0 else nodes[parent])
+                nodes.append(node)
+                if is_truncated:
+                    builder.truncate(node)
+            if root_truncated:
+                builder.truncate(root)
+
+        def requirements_key(requirements):
+            # Requirements are kept ordered, since `get_requirements` is sensitive to
+            # the order in which additional requirements are offered
+            return None if requirements is None else tuple(requirements)
+
+        def build_graph(
+            parameter, additional_requirements=None, memo=None
+        ) -> SourceNode:
+            key = (parameter, requirements_key(additional_requirements))
+            memo = {} if memo is None else memo
+            try:
+                return memo[key]
+            except KeyError:
+                node = SourceNode(parameter, requirements=key[1])
+                memo[key] = node
+
+            sources, additional_requirements = get_sources_and_requirements(
+                parameter, additional_requirements=additional_requirements
+            )
+            node.sources = [
+                build_graph(
+                    source, additional_requirements=additional_requirements, memo=memo
+                )
+                for source in sources
+            ]
+
+            return node
+
+        def build_lazy_tree(
+            parameter,
+            parent=None,
+            additional_requirements=None,
+            max_depth=None,
+            path=frozenset(),
+        ) -> LazyNodeTree:
+            path = path.union([parameter])
+            if max_depth is not None and max_depth <= 0:
+                node = LazyNodeTree(parameter, parent=parent)
+                sources, _ = get_sources_and_requirements(
+                    parameter, additional_requirements=additional_requirements
+                )
+                if any(source not in path for source in sources):
+                    node.truncate()  # Like the eager search, flag what is cut off
+                return node
+
+            def expand(node):
+                sources, requirements = get_sources_and_requirements(
+                    parameter, additional_requirements=additional_requirements
+                )
+                for source in sources:
+                    if source in path:
+                        continue  # Break cycles
+                    build_lazy_tree(
+                        source,
+                        parent=node,
+                        additional_requirements=requirements,
+                        max_depth=None if max_depth is None else max_depth - 1,
+                        path=path,
+                    )
+
+            return LazyNodeTree(parameter, parent=parent, expand=expand)
+
+        def get_sources_and_requirements(parameter, additional_requirements=None):
+            """
+            The sources of an individual, and the requirements to pass along when
+            searching for _their_ sources.
+            """
+            with to_ids(parameter, additional_requirements) as (i, requirements):
+                graph = constructor.graph
+                sources, requirements = graph.get_sources_and_requirements(
+                    i, requirements
+                )
+                return (
+                    graph.individuals_of(sources),
+                    (
+                        None
+                        if requirements is None
+                        else graph.individuals_of(requirements)
+                    ),
                 )
 
+        def iterate_workflows(node: SourceNode, path=frozenset()):
+            """
+            Yield the workflows from a source graph node as nested
+            `(value, (*workflows,))` tuples.
+            """
+            path = path.union([node.value])
+            sources = [s for s in node.sources if s.value not in path]  # Break cycles
+            if isinstance(node.value, (Input, Generic)):
+                # The sources are alternatives to choose between. Only those without
+                # any are leaves, if they were all cycles there is no workflow here
+                if len(node.sources) == 0:
+                    yield node.value, ()
+                for source in sources:
+                    for workflow in iterate_workflows(source, path=path):
+                        yield node.value, (workflow,)
+            else:
+                # All the sources are needed
+                for workflows in iterate_combinations(sources, path):
+                    yield node.value, workflows
+
+        def iterate_combinations(nodes: list[SourceNode], path):
+            """
+            Like `itertools.product` over the workflows of each node, but re-generating
+            instead of storing them.
+            """
+            if len(nodes) == 0:
+                yield ()
+                return
+            for first in iterate_workflows(nodes[0], path=path):
+                for rest in iterate_combinations(nodes[1:], path):
+                    yield (first,) + rest
+
+        def workflow_to_tree(workflow, parent=None) -> NodeTree:
+            value, sources = workflow
+            node = NodeTree(value, parent=parent)
+            for source in sources:
+                workflow_to_tree(source, parent=node)
             return node
 
         def build_path(
@@ -422,8 +1189,8 @@ class Constructor:
         ):
             node = NodeTree(parameter, parent=parent)
 
-            sources = parameter.get_sources(
-                additional_requirements=additional_requirements
+            sources, _ = get_sources_and_requirements(
+                parameter, additional_requirements=additional_requirements
             )
 
             if len(path_indices) > 0:
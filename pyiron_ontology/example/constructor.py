@@ -8,9 +8,12 @@ tests.
 
 from __future__ import annotations
 
+from typing import Optional
+
 import owlready2 as owl
 
 from pyiron_ontology.constructor import Constructor
+from pyiron_ontology.reasoner import ReasonerSession
 
 
 class ExampleOntology(Constructor):
@@ -31,8 +34,21 @@ class ExampleOntology(Constructor):
     distinguish siblings/inheritance.
     """
 
-    def __init__(self, name: str = "example", closed: bool = True, strict: bool = True):
-        super().__init__(name=name, closed=closed, strict=strict)
+    def __init__(
+        self,
+        name: str = "example",
+        closed: bool = True,
+        strict: bool = True,
+        cache_dir: Optional[str] = None,
+        reasoner: str | ReasonerSession = "pellet",
+    ):
+        super().__init__(
+            name=name,
+            closed=closed,
+            strict=strict,
+            cache_dir=cache_dir,
+            reasoner=reasoner,
+        )
 
     def _make_specific_declarations(self):
         onto = self.onto
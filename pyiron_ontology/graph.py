@@ -0,0 +1,461 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+"""
+A compiled, array-based snapshot of the workflow relations in a reasoned ontology.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+import owlready2 as owl
+
+from pyiron_ontology.index import ClassIndex
+
+
+class CSR:
+    """
+    A compressed sparse row adjacency: the neighbours of row `i` are
+    `indices[indptr[i]:indptr[i + 1]]`.
+
+    Args:
+        rows (list[Iterable[int]]): The neighbours of each row.
+    """
+
+    def __init__(self, rows: list[list[int]] = ()):
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.extend(rows)
+
+    def extend(self, rows: list[list[int]]) -> None:
+        """Append rows."""
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        self.indptr = np.concatenate(
+            [self.indptr, self.indptr[-1] + np.cumsum(lengths)]
+        )
+        self.indices = np.concatenate(
+            [
+                self.indices,
+                np.fromiter(
+                    chain.from_iterable(rows), dtype=np.int64, count=lengths.sum()
+                ),
+            ]
+        )
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i] : self.indptr[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+
+class CompiledGraph:
+    """
+    The functions, inputs, outputs and generics of an ontology with dense integer
+    ids, and the relations between them as arrays, so that source searches can hop
+    through the workflow graph without going through owlready2 (and its quadstore)
+    at all.
+
+    Mirrors the `get_sources` logic of the universal pyiron ontology classes, but
+    taking and giving ids. Only individuals present at compilation or added
+    afterwards (with :meth:`add`) are known, plus generics that only live for one
+    search (see :meth:`transient`).
+
+    Args:
+        onto (owl.Ontology): The (reasoned) ontology, with the universal pyiron
+            declarations.
+        class_index (ClassIndex): The index of classes to represent generics by.
+    """
+
+    FUNCTION, INPUT, OUTPUT, GENERIC = range(4)
+    batch_threshold = 16  # Below this many outputs, array overhead isn't worth it
+    TRANSIENT = 1 << 30  # Ids from here on are transient generics
+
+    def __init__(self, onto: owl.Ontology, class_index: ClassIndex):
+        self.class_index = class_index
+        self.individuals = []
+        self.ids = {}
+        self.kinds = np.zeros(0, dtype=np.int8)
+        self.generic = np.zeros(0, dtype=np.int64)
+        self.output_of = np.zeros(0, dtype=np.int64)
+        self.mandatory_inputs = CSR()
+        self.optional_inputs = CSR()
+        self.outputs = CSR()
+        self.requirements = CSR()
+        self.transitive_requirements = CSR()
+        self.generic_classes = CSR()
+        self.representations = CSR()
+        self.things = []
+        self.disjoints = []
+        # Class id -> the outputs whose generic is a member of that class, in the
+        # same order as the `IOIndex`
+        self.outputs_by_class = []
+        # Class membership matrices (generic row x class id), with the row of each
+        # generic id
+        self.generic_rows = np.zeros(0, dtype=np.int64)
+        self.things_matrix = np.zeros((0, 0), dtype=bool)
+        self.disjoints_matrix = np.zeros((0, 0), dtype=bool)
+        self._options = {}
+        # Transient id -> the generic, its (things, disjoints) bitsets and class ids
+        self._transient = {}
+        self.add(
+            functions=onto.Function.instances(),
+            inputs=onto.Input.instances(),
+            outputs=onto.Output.instances(),
+            generics=onto.Generic.instances(),
+        )
+
+    def add(
+        self,
+        functions: Iterable[owl.Thing] = (),
+        inputs: Iterable[owl.Thing] = (),
+        outputs: Iterable[owl.Thing] = (),
+        generics: Iterable[owl.Thing] = (),
+    ) -> list[int]:
+        """
+        Give new individuals ids, and add their relations to the graph.
+
+        Individuals referring to each other can be added together, but anything
+        else they refer to must be known already. Individuals that are known already
+        are left as they are, so new inputs of known functions need a recompilation.
+
+        Returns:
+            (list[int]): The ids of the individuals that were new.
+
+        Raises:
+            (KeyError): If the new individuals refer to unknown ones.
+        """
+        groups = [
+            list(dict.fromkeys(i for i in group if i not in self.ids))
+            for group in (functions, inputs, outputs, generics)
+        ]
+        new = list(chain.from_iterable(groups))
+        start = len(self.individuals)
+        ids = list(range(start, start + len(new)))
+        kinds = np.repeat(
+            np.arange(len(groups), dtype=np.int8), [len(g) for g in groups]
+        )
+        self.individuals.extend(new)
+        self.ids.update(zip(new, ids))
+
+        generic = np.full(len(new), -1, dtype=np.int64)
+        output_of = np.full(len(new), -1, dtype=np.int64)
+        mandatory_inputs, optional_inputs, outputs = [], [], []
+        requirements, transitive_requirements = [], []
+        generic_classes = []
+        try:
+            for n, (individual, kind) in enumerate(zip(new, kinds)):
+                is_function = kind == self.FUNCTION
+                is_input = kind == self.INPUT
+                mandatory_inputs.append(
+                    self.ids_of(individual.mandatory_inputs) if is_function else []
+                )
+                optional_inputs.append(
+                    self.ids_of(individual.optional_inputs) if is_function else []
+                )
+                outputs.append(self.ids_of(individual.outputs) if is_function else [])
+                requirements.append(
+                    self.ids_of(individual.requirements) if is_input else []
+                )
+                transitive_requirements.append(
+                    self.ids_of(individual.transitive_requirements) if is_input else []
+                )
+                if kind in (self.INPUT, self.OUTPUT) and individual.generic is not None:
+                    generic[n] = self.ids[individual.generic]
+                if kind == self.OUTPUT and individual.output_of is not None:
+                    output_of[n] = self.ids[individual.output_of]
+                if kind == self.GENERIC:
+                    generic_classes.append(
+                        [
+                            self.class_index.get_id(c)
+                            for c in individual.is_a
+                            if isinstance(c, owl.ThingClass)
+                        ]
+                    )
+                else:
+                    generic_classes.append([])
+        except KeyError:
+            # Leave the graph as it was
+            del self.individuals[start:]
+            for individual in new:
+                del self.ids[individual]
+            raise
+        self.kinds = np.concatenate([self.kinds, kinds])
+        self.generic = np.concatenate([self.generic, generic])
+        self.output_of = np.concatenate([self.output_of, output_of])
+        self.mandatory_inputs.extend(mandatory_inputs)
+        self.optional_inputs.extend(optional_inputs)
+        self.outputs.extend(outputs)
+        self.requirements.extend(requirements)
+        self.transitive_requirements.extend(transitive_requirements)
+        self.generic_classes.extend(generic_classes)
+
+        new_generics = groups[self.GENERIC]
+        masks = [self.class_index.representation_masks(g) for g in new_generics]
+        self.things.extend([0] * (len(new) - len(new_generics)))
+        self.things.extend(things for things, _ in masks)
+        self.disjoints.extend([0] * (len(new) - len(new_generics)))
+        self.disjoints.extend(disjoints for _, disjoints in masks)
+
+        n_rows = len(self.things_matrix)
+        generic_rows = np.full(len(new), -1, dtype=np.int64)
+        generic_rows[kinds == self.GENERIC] = np.arange(
+            n_rows, n_rows + len(new_generics)
+        )
+        self.generic_rows = np.concatenate([self.generic_rows, generic_rows])
+        self._grow_class_columns()
+        new_things = np.zeros((len(new_generics), self.n_classes), dtype=bool)
+        new_disjoints = np.zeros((len(new_generics), self.n_classes), dtype=bool)
+        for row, (things, disjoints) in enumerate(masks):
+            new_things[row, self.class_index.ids_in(things)] = True
+            new_disjoints[row, self.class_index.ids_in(disjoints)] = True
+        self.things_matrix = np.concatenate([self.things_matrix, new_things])
+        self.disjoints_matrix = np.concatenate([self.disjoints_matrix, new_disjoints])
+
+        for i in ids:
+            if self.kinds[i] == self.OUTPUT and self.generic[i] >= 0:
+                for c in self.class_index.ids_in(self.things[self.generic[i]]):
+                    self.outputs_by_class[c][i] = None
+
+        # For each output, the ids of the generics representing it: the options of
+        # its function and its generic
+        self.representations.extend(
+            [
+                (
+                    self._option_generics(self.output_of[i])
+                    + ([int(self.generic[i])] if self.generic[i] >= 0 else [])
+                    if self.kinds[i] == self.OUTPUT
+                    else []
+                )
+                for i in ids
+            ]
+        )
+        return ids
+
+    @property
+    def n_classes(self) -> int:
+        return self.things_matrix.shape[1]
+
+    def _grow_class_columns(self) -> None:
+        """Make room for the classes the class index has learned about since."""
+        n_new = len(self.class_index.classes) - self.n_classes
+        if n_new > 0:
+            padding = np.zeros((len(self.things_matrix), n_new), dtype=bool)
+            self.things_matrix = np.concatenate([self.things_matrix, padding], axis=1)
+            self.disjoints_matrix = np.concatenate(
+                [self.disjoints_matrix, padding], axis=1
+            )
+            self.outputs_by_class.extend({} for _ in range(n_new))
+
+    def ids_of(self, individuals: Iterable[owl.Thing]) -> list[int]:
+        """
+        Raises:
+            (KeyError): If any individual was not there at compilation.
+        """
+        return [self.ids[individual] for individual in individuals]
+
+    def individuals_of(self, ids: Iterable[int]) -> list[owl.Thing]:
+        return [
+            self.individuals[i] if i < self.TRANSIENT else self._transient[i][0]
+            for i in ids
+        ]
+
+    @contextmanager
+    def transient(self, generics: Iterable[owl.Thing]) -> Iterator[list[int]]:
+        """
+        Give generics the graph doesn't know (e.g. requirements made on the fly) ids
+        for as long as the context lasts, without adding them to the graph.
+
+        Yields:
+            (list[int]): The ids of the generics.
+        """
+        ids = []
+        try:
+            for generic in generics:
+                entry = (
+                    generic,
+                    *self.class_index.representation_masks(generic),
+                    [
+                        self.class_index.get_id(c)
+                        for c in generic.is_a
+                        if isinstance(c, owl.ThingClass)
+                    ],
+                )
+                i = self.TRANSIENT
+                # Take the first free id, also when other searches are running
+                while self._transient.setdefault(i, entry) is not entry:
+                    i += 1
+                ids.append(i)
+            self._grow_class_columns()
+            yield ids
+        finally:
+            for i in ids:
+                del self._transient[i]
+
+    def lookup(self, *ids: int) -> Sequence[owl.Thing]:
+        """
+        The individuals by id, for trees that (may) hold some of these transient
+        ids, and outlive them.
+        """
+        transient = {i: self._transient[i][0] for i in ids if i >= self.TRANSIENT}
+        return self.individuals if len(transient) == 0 else _Lookup(self, transient)
+
+    def masks(self, generic: int) -> tuple[int, int]:
+        """The `(things, disjoints)` bitsets of a (possibly transient) generic"""
+        if generic < self.TRANSIENT:
+            return self.things[generic], self.disjoints[generic]
+        return self._transient[generic][1:3]
+
+    def _option_generics(self, function: int) -> list[int]:
+        if function < 0:
+            return []
+        return [
+            int(generic)
+            for inp in chain(
+                self.mandatory_inputs[function], self.optional_inputs[function]
+            )
+            for generic in chain(
+                [self.generic[inp]],
+                self.requirements[inp],
+                self.transitive_requirements[inp],
+            )
+        ]
+
+    def options(self, function: int) -> list[tuple[int, int]]:
+        """The `(things, disjoints)` bitsets of all the options of a function"""
+        try:
+            return self._options[function]
+        except KeyError:
+            options = [
+                (self.things[generic], self.disjoints[generic])
+                for generic in self._option_generics(function)
+            ]
+            self._options[function] = options
+            return options
+
+    def satisfies(self, output: int, requirements: Iterable[int]) -> bool:
+        """Like `Output.satisfies`"""
+        generic = self.generic[output]
+        function = self.output_of[output]
+        others = [] if function < 0 else list(self.options(function))
+        others.append((self.things[generic], self.disjoints[generic]))
+        return all(
+            any(self.class_index.compatible(*self.masks(r), *other) for other in others)
+            for r in requirements
+        )
+
+    def get_requirements(
+        self, inp: int, additional_requirements: Optional[Iterable[int]] = None
+    ) -> list[int]:
+        """Like `Input.get_requirements`"""
+        requirements = [int(self.generic[inp])] + self.requirements[inp].tolist()
+        if additional_requirements is None:
+            return requirements
+        base = [(self.things[r], self.disjoints[r]) for r in requirements]
+        transitive = [
+            (self.things[r], self.disjoints[r])
+            for r in self.transitive_requirements[inp]
+        ]
+        for add_req in additional_requirements:
+            add_things, add_disjoints = self.masks(add_req)
+            for i, (base_things, base_disjoints) in enumerate(base):
+                if self.class_index.as_or_more_specific(
+                    add_things, base_things, base_disjoints
+                ):
+                    requirements[i] = add_req
+                    break
+            else:
+                for trans_things, trans_disjoints in transitive:
+                    if self.class_index.compatible(
+                        add_things, add_disjoints, trans_things, trans_disjoints
+                    ):
+                        requirements.append(add_req)
+                        break
+        return requirements
+
+    def generic_sources(
+        self, generic: int, requirements: Optional[Iterable[int]] = None
+    ) -> list[int]:
+        """Like `Generic.get_sources`"""
+        found = {}
+        classes = (
+            self.generic_classes[generic]
+            if generic < self.TRANSIENT
+            else self._transient[generic][3]
+        )
+        for c in classes:
+            found.update(self.outputs_by_class[c])
+        outputs = list(found)
+        if requirements is None:
+            return outputs
+        elif len(outputs) < self.batch_threshold:
+            return [o for o in outputs if self.satisfies(o, requirements)]
+        return self.satisfying(outputs, requirements)
+
+    def satisfying(self, outputs: list[int], requirements: Iterable[int]) -> list[int]:
+        """
+        Like `Output.satisfies`, but checking all the outputs at once.
+
+        Returns:
+            (list[int]): The outputs that satisfy the requirements, in order.
+        """
+        outputs = np.asarray(outputs, dtype=np.int64)
+        starts = self.representations.indptr[outputs]
+        lengths = self.representations.indptr[outputs + 1] - starts
+        # Gather the representations of all the outputs into one flat array
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        representations = self.representations.indices[
+            offsets + np.arange(lengths.sum())
+        ]
+        owners = np.repeat(np.arange(len(outputs)), lengths)
+        self._grow_class_columns()
+        things = self.things_matrix[self.generic_rows[representations]]
+        disjoints = self.disjoints_matrix[self.generic_rows[representations]]
+
+        satisfied = np.ones(len(outputs), dtype=bool)
+        for requirement in requirements:
+            requirement_things, requirement_disjoints = self.masks(requirement)
+            compatible = ~(
+                things[:, self.class_index.ids_in(requirement_disjoints)].any(1)
+                | disjoints[:, self.class_index.ids_in(requirement_things)].any(1)
+            )
+            satisfied &= np.bincount(owners, compatible, len(outputs)) > 0
+        return outputs[satisfied].tolist()
+
+    def get_sources_and_requirements(
+        self, i: int, additional_requirements: Optional[Iterable[int]] = None
+    ) -> tuple[list[int], Optional[list[int]]]:
+        """
+        The sources of an individual, and the requirements to pass along when
+        searching for _their_ sources.
+        """
+        kind = self.kinds[i] if i < self.TRANSIENT else self.GENERIC
+        if kind == self.INPUT:
+            requirements = self.get_requirements(i, additional_requirements)
+            return self.generic_sources(self.generic[i], requirements), requirements
+        elif kind == self.GENERIC:
+            sources = self.generic_sources(i, additional_requirements)
+        elif kind == self.OUTPUT:
+            sources = [] if self.output_of[i] < 0 else [int(self.output_of[i])]
+        else:
+            sources = self.mandatory_inputs[i].tolist()
+        return sources, additional_requirements
+
+
+class _Lookup:
+    """The individuals of a graph, plus some that were transient in it."""
+
+    __slots__ = ("graph", "transient")
+
+    def __init__(self, graph: CompiledGraph, transient: dict[int, owl.Thing]):
+        self.graph = graph
+        self.transient = transient
+
+    def __getitem__(self, i: int) -> owl.Thing:
+        if i < self.graph.TRANSIENT:
+            return self.graph.individuals[i]
+        return self.transient[i]
@@ -0,0 +1,199 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+"""
+Precomputed indices over a reasoned ontology, for fast searching.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import owlready2 as owl
+
+
+class ClassIndex:
+    """
+    Gives each class a dense integer id, and stores the ancestors and disjoints of
+    each class as bitsets (python integers with the bit of each class id set), so
+    that questions of compatibility and specificity reduce to bitwise operations.
+
+    Classes unknown to the index are added (with their ancestors) when they are
+    first encountered.
+
+    Args:
+        classes (Iterable[owl.ThingClass]): The classes to index.
+    """
+
+    def __init__(self, classes: Iterable[owl.ThingClass] = ()):
+        self.classes = []
+        self.ids = {}
+        self.ancestors = []
+        self.disjoints = []
+        # Individuals are known by their classes, so the throwaway individuals made
+        # for searches share entries instead of piling up
+        self._masks_by_classes = {}
+        self.mask(sorted(set(classes).union([owl.Thing]), key=lambda c: c.storid))
+
+    def get_id(self, cls: owl.ThingClass) -> int:
+        try:
+            return self.ids[cls]
+        except KeyError:
+            return self._add(cls)
+
+    def _add(self, cls: owl.ThingClass) -> int:
+        i = len(self.classes)
+        self.ids[cls] = i
+        self.classes.append(cls)
+        self.ancestors.append(1 << i)
+        self.disjoints.append(0)
+        if cls is owl.Nothing:
+            # Unsatisfiable classes are equivalent to Nothing, which has no ancestors
+            return i
+        self.ancestors[i] = self.mask(cls.ancestors())
+        if cls is not owl.Thing:
+            try:
+                self.disjoints[i] = self.mask(
+                    e for e in next(cls.disjoints()).entities if e is not cls
+                )
+                # Only the first set of disjoints counts, consistent with
+                # `get_disjoints_set`
+            except StopIteration:
+                pass
+        return i
+
+    def mask(self, classes: Iterable[owl.ThingClass]) -> int:
+        """The bitset of the given classes"""
+        mask = 0
+        for cls in classes:
+            mask |= 1 << self.get_id(cls)
+        return mask
+
+    def ancestor_mask(self, classes: Iterable[owl.ThingClass]) -> int:
+        """The bitset of the given classes and all their ancestors"""
+        mask = 0
+        for cls in classes:
+            mask |= self.ancestors[self.get_id(cls)]
+        return mask
+
+    def disjoint_mask(self, things: int) -> int:
+        """The bitset of everything disjoint to the classes in a bitset"""
+        mask = 0
+        for i in self.ids_in(things):
+            mask |= self.disjoints[i]
+        return mask
+
+    @staticmethod
+    def ids_in(mask: int) -> list[int]:
+        ids = []
+        while mask:
+            lowest = mask & -mask
+            ids.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return ids
+
+    def classes_in(self, mask: int) -> list[owl.ThingClass]:
+        return [self.classes[i] for i in self.ids_in(mask)]
+
+    def representation_masks(self, individual: owl.Thing) -> tuple[int, int]:
+        """
+        The bitset analogue of `Generic.representation_info`.
+
+        Returns:
+            (int, int): The bitsets of the indirect classes of the individual, and of
+                everything those are disjoint with.
+        """
+        classes = frozenset(c for c in individual.is_a if isinstance(c, owl.ThingClass))
+        try:
+            return self._masks_by_classes[classes]
+        except KeyError:
+            things = self.ancestor_mask(classes)
+            masks = (things, self.disjoint_mask(things))
+            self._masks_by_classes[classes] = masks
+            return masks
+
+    @staticmethod
+    def compatible(
+        things1: int, disjoints1: int, things2: int, disjoints2: int
+    ) -> bool:
+        """The bitset analogue of `compatible_classes`"""
+        return not (disjoints1 & things2 or disjoints2 & things1)
+
+    @staticmethod
+    def as_or_more_specific(
+        candidate_things: int, reference_things: int, reference_disjoints: int
+    ) -> bool:
+        """
+        Whether the candidate is not disjoint to the reference and has at least all
+        its classes.
+        """
+        return not (
+            reference_disjoints & candidate_things
+            or reference_things & ~candidate_things
+        )
+
+
+class IOIndex:
+    """
+    An inverted index from classes to the IO individuals whose generic is a member of
+    that class (directly or through inheritance), so that finding the IO for a class
+    does not require searching the whole world for the class instances.
+
+    Also keeps the reverse, forward-looking relations: which mandatory inputs have a
+    generic declared directly with each class, and which outputs come from functions
+    that need no input at all.
+
+    Args:
+        class_index (ClassIndex): The class index providing class ids and ancestry.
+        ios (Iterable[owl.Thing]): The IO individuals to index.
+    """
+
+    def __init__(self, class_index: ClassIndex, ios: Iterable[owl.Thing] = ()):
+        self.class_index = class_index
+        self._ios = {}
+        self._consumers = {}
+        self._unconditional = {}
+        self.add(*ios)
+
+    def add(self, *ios: owl.Thing) -> None:
+        """Index new IO individuals"""
+        for io in ios:
+            if io.generic is None:
+                continue
+            things, _ = self.class_index.representation_masks(io.generic)
+            for i in self.class_index.ids_in(things):
+                # Dicts as insertion-ordered sets, for a reproducible ordering
+                self._ios.setdefault(i, {})[io] = None
+
+            if getattr(io, "output_of", None) is not None:
+                if len(io.output_of.mandatory_inputs) == 0:
+                    self._unconditional[io] = None
+                else:
+                    self._unconditional.pop(io, None)
+            elif getattr(io, "mandatory_input_of", None) is not None:
+                for cls in io.generic.is_a:
+                    if isinstance(cls, owl.ThingClass):
+                        i = self.class_index.get_id(cls)
+                        self._consumers.setdefault(i, {})[io] = None
+
+    def get(self, classes: Iterable[owl.ThingClass]) -> list[owl.Thing]:
+        """The IO whose generic is a member of any of the given classes"""
+        found = {}
+        for cls in classes:
+            found.update(self._ios.get(self.class_index.get_id(cls), {}))
+        return list(found)
+
+    def get_consumers(self, things: int) -> list[owl.Thing]:
+        """
+        The mandatory inputs whose generic is declared with any of the classes in a
+        bitset, i.e. those which something with these classes might be a source of.
+        """
+        found = {}
+        for i in self.class_index.ids_in(things):
+            found.update(self._consumers.get(i, {}))
+        return list(found)
+
+    @property
+    def unconditional_outputs(self) -> list[owl.Thing]:
+        """The outputs of functions without any mandatory inputs"""
+        return list(self._unconditional)
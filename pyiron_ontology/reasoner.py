@@ -0,0 +1,516 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+"""
+A pure-python reasoner for the (small) fragment of OWL used by pyiron ontologies, and
+tools for applying reasoning results to owlready2 ontologies.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import owlready2 as owl
+from owlready2.reasoning import (
+    _apply_inferred_data_relations,
+    _apply_inferred_obj_relations,
+    _apply_reasoning_results,
+)
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+SUBCLASS_OF = "http://www.w3.org/2000/01/rdf-schema#subClassOf"
+EQUIVALENT_CLASS = "http://www.w3.org/2002/07/owl#equivalentClass"
+THING = "http://www.w3.org/2002/07/owl#Thing"
+NOTHING = "http://www.w3.org/2002/07/owl#Nothing"
+
+
+def extract_axioms(
+    world: owl.World, entities: Optional[Iterable[owl.EntityClass | owl.Thing]] = None
+) -> set[tuple]:
+    """
+    Collect the axioms of a world that fall into the fragment understood by the
+    :class:`StructuralReasoner`, with all entities given by their IRI.
+
+    The axioms are tuples of the form
+
+    - `("subclass", child, parent)`
+    - `("equivalent", cls, positive, negative)`, for a class equivalent to the
+      intersection of the `positive` classes and the complements of the `negative`
+      classes
+    - `("disjoint", classes)`
+    - `("disjoint_properties", properties)`
+    - `("type", individual, cls)`
+    - `("relation", subject, property, object)`, only for properties with disjoints
+
+    Anything outside this fragment (e.g. property restrictions) is ignored.
+
+    Args:
+        world (owl.World): The world to read.
+        entities (Iterable[owl.EntityClass | owl.Thing] | None): Only collect the
+            axioms about these classes and individuals. (Default is None, collect
+            everything.)
+
+    Returns:
+        (set[tuple]): The axioms.
+    """
+    if entities is None:
+        classes = world.classes()
+        individuals = world.individuals()
+    else:
+        entities = list(entities)
+        classes = [e for e in entities if isinstance(e, owl.ThingClass)]
+        individuals = [e for e in entities if isinstance(e, owl.Thing)]
+
+    axioms = set()
+    for cls in classes:
+        for parent in cls.is_a:
+            if isinstance(parent, owl.ThingClass):
+                axioms.add(("subclass", cls.iri, parent.iri))
+            elif isinstance(parent, owl.Not) and isinstance(
+                parent.Class, owl.ThingClass
+            ):
+                axioms.add(("disjoint", frozenset([cls.iri, parent.Class.iri])))
+        for definition in cls.equivalent_to:
+            operands = (
+                definition.Classes if isinstance(definition, owl.And) else [definition]
+            )
+            positive, negative = set(), set()
+            for operand in operands:
+                if isinstance(operand, owl.ThingClass):
+                    positive.add(operand.iri)
+                elif isinstance(operand, owl.Not) and isinstance(
+                    operand.Class, owl.ThingClass
+                ):
+                    negative.add(operand.Class.iri)
+                else:
+                    break
+            else:
+                axioms.add(
+                    ("equivalent", cls.iri, frozenset(positive), frozenset(negative))
+                )
+        if entities is not None:
+            for disjoint in cls.disjoints():
+                axioms.add(("disjoint", frozenset(e.iri for e in disjoint.entities)))
+    if entities is None:
+        for disjoint in world.disjoint_classes():
+            axioms.add(("disjoint", frozenset(e.iri for e in disjoint.entities)))
+
+    disjoint_properties = set()
+    for disjoint in world.disjoint_properties():
+        axioms.add(("disjoint_properties", frozenset(e.iri for e in disjoint.entities)))
+        disjoint_properties.update(disjoint.entities)
+
+    for individual in individuals:
+        for cls in individual.is_a:
+            if isinstance(cls, owl.ThingClass):
+                axioms.add(("type", individual.iri, cls.iri))
+        if entities is not None:
+            for prop in disjoint_properties:
+                for obj in prop[individual]:
+                    if isinstance(obj, owl.Thing):
+                        axioms.add(("relation", individual.iri, prop.iri, obj.iri))
+                if prop.inverse is not None:
+                    for subject in prop.inverse[individual]:
+                        axioms.add(("relation", subject.iri, prop.iri, individual.iri))
+    if entities is None:
+        for prop in disjoint_properties:
+            for subject, obj in prop.get_relations():
+                if isinstance(obj, owl.Thing):
+                    axioms.add(("relation", subject.iri, prop.iri, obj.iri))
+    return axioms
+
+
+class StructuralReasoner:
+    """
+    Classifies the fragment of OWL that pyiron ontologies actually use -- named
+    subclassing, disjointness of classes and properties, and classes defined as an
+    intersection of named classes and complements of named classes (e.g. `Bulk`) --
+    without leaving python.
+
+    Classes with disjoint ancestors are unsatisfiable and are reported (like Pellet
+    does) as being equivalent to `owl.Nothing`; individuals that end up in disjoint
+    classes, or related to the same thing by disjoint properties, make the ontology
+    inconsistent.
+
+    Inverse property values are not inferred, since owlready2 already resolves them
+    in python.
+
+    After reasoning, the classified classes are kept so that new individuals and
+    classes can be reasoned about incrementally (cf. :meth:`infer_increment`).
+    """
+
+    def __init__(self, axioms: Iterable[tuple] = ()):
+        self.axioms = set(axioms)
+        self._classified = False
+
+    def update(self, added: Iterable[tuple] = (), removed: Iterable[tuple] = ()):
+        self.axioms.difference_update(removed)
+        self.axioms.update(added)
+        self._classified = False
+
+    def infer(self) -> list[tuple[str, str, str]]:
+        """
+        Reason over the current axioms.
+
+        Returns:
+            (list[tuple[str, str, str]]): The inferred `(subject, predicate, object)`
+                triples, by IRI.
+
+        Raises:
+            (owl.OwlReadyInconsistentOntologyError): If an individual is a member of
+                disjoint classes.
+        """
+        self._parents = defaultdict(set)
+        self._definitions = []
+        self._disjoints = defaultdict(set)
+        self._disjoint_properties = defaultdict(set)
+        self._types = defaultdict(set)
+        self._relations = defaultdict(set)
+        self._classes = {NOTHING}
+        self._ancestors = {}
+        self._classified = False
+
+        self._index(self.axioms)
+        inferred = self._classify(self._classes)
+        inferred += self._realize(self._types)
+        self._check_relations(self._relations)
+        self._classified = True
+        return inferred
+
+    def infer_increment(self, axioms: Iterable[tuple]) -> list[tuple[str, str, str]]:
+        """
+        Add axioms and reason only over what they introduce, using the classes as
+        they were classified by the last call to :meth:`infer`.
+
+        This is only possible when the new axioms are about new classes and
+        individuals, otherwise (or if nothing was classified yet) the reasoner falls
+        back to reasoning over everything.
+
+        Args:
+            axioms (Iterable[tuple]): The axioms to add.
+
+        Returns:
+            (list[tuple[str, str, str]]): The inferred `(subject, predicate, object)`
+                triples, by IRI.
+
+        Raises:
+            (owl.OwlReadyInconsistentOntologyError): If an individual is a member of
+                disjoint classes.
+        """
+        new = set(axioms).difference(self.axioms)
+        if not self._classified or not self._is_increment(new):
+            self.update(added=new)
+            return self.infer()
+
+        self.axioms.update(new)
+        known_classes = set(self._classes)
+        try:
+            self._index(new)
+            inferred = self._classify(self._classes.difference(known_classes))
+            inferred += self._realize(
+                {args[0]: self._types[args[0]] for kind, *args in new if kind == "type"}
+            )
+            self._check_relations(
+                {
+                    (args[0], args[2]): self._relations[(args[0], args[2])]
+                    for kind, *args in new
+                    if kind == "relation"
+                }
+            )
+        except Exception:
+            self._classified = False  # Half-indexed, so start over next time
+            raise
+        return inferred
+
+    def _is_increment(self, axioms: set[tuple]) -> bool:
+        """Whether the axioms leave everything that was already classified untouched"""
+        for kind, *args in axioms:
+            if kind == "subclass" and args[0] in self._classes:
+                return False
+            elif kind == "disjoint" and args[0].issubset(self._classes):
+                return False
+            elif kind in ("equivalent", "disjoint_properties"):
+                return False
+        return True
+
+    def _index(self, axioms: Iterable[tuple]) -> None:
+        for kind, *args in axioms:
+            if kind == "subclass":
+                child, parent = args
+                self._parents[child].add(parent)
+                self._classes.update(args)
+            elif kind == "equivalent":
+                cls, positive, negative = args
+                if len(negative) == 0 and len(positive) == 1:
+                    # A simple equivalence, so each is the parent of the other
+                    self._parents[next(iter(positive))].add(cls)
+                self._parents[cls].update(positive)
+                for other in negative:
+                    self._disjoints[cls].add(other)
+                    self._disjoints[other].add(cls)
+                self._definitions.append((cls, positive, negative))
+                self._classes.update([cls, *positive, *negative])
+            elif kind == "disjoint":
+                for cls in args[0]:
+                    self._disjoints[cls].update(args[0] - {cls})
+                self._classes.update(args[0])
+            elif kind == "disjoint_properties":
+                for prop in args[0]:
+                    self._disjoint_properties[prop].update(args[0] - {prop})
+            elif kind == "type":
+                individual, cls = args
+                self._types[individual].add(cls)
+                self._classes.add(cls)
+            elif kind == "relation":
+                subject, prop, obj = args
+                self._relations[(subject, obj)].add(prop)
+
+    def _classify(self, classes: set[str]) -> list[tuple[str, str, str]]:
+        """Find the ancestors of the classes, and report new parents and nothings"""
+        inferred = []
+        while True:
+            self._ancestors.update(self._get_ancestors(classes, self._parents))
+            new_parents = [
+                (cls, defined)
+                for cls in classes
+                if not self._is_unsatisfiable(self._ancestors[cls])
+                for defined in self._get_definitions_met(self._ancestors[cls])
+            ]
+            if len(new_parents) == 0:
+                break
+            for cls, defined in new_parents:
+                self._parents[cls].add(defined)
+                inferred.append((cls, SUBCLASS_OF, defined))
+
+        for cls in sorted(classes):
+            if (
+                cls != NOTHING
+                and NOTHING not in self._parents[cls]
+                and self._is_unsatisfiable(self._ancestors[cls])
+            ):
+                inferred.append((cls, EQUIVALENT_CLASS, NOTHING))
+        return inferred
+
+    def _realize(self, types: dict[str, set[str]]) -> list[tuple[str, str, str]]:
+        """Check the individuals are consistent, and report new classes for them"""
+        inferred = []
+        for individual, individual_types in types.items():
+            individual_ancestors = set(individual_types).union(
+                *(self._ancestors[cls] for cls in individual_types)
+            )
+            while True:
+                if self._is_unsatisfiable(individual_ancestors):
+                    raise owl.OwlReadyInconsistentOntologyError(
+                        f"{individual} is a member of disjoint classes: "
+                        f"{sorted(individual_types)}"
+                    )
+                met = self._get_definitions_met(individual_ancestors)
+                if len(met) == 0:
+                    break
+                for defined in met:
+                    individual_ancestors.update(self._ancestors[defined])
+                    inferred.append((individual, RDF_TYPE, defined))
+        return inferred
+
+    def _check_relations(self, relations: dict[tuple[str, str], set[str]]) -> None:
+        for (subject, obj), props in relations.items():
+            for prop in props:
+                if len(self._disjoint_properties[prop].intersection(props)) > 0:
+                    raise owl.OwlReadyInconsistentOntologyError(
+                        f"{subject} is related to {obj} by disjoint properties: "
+                        f"{sorted(props)}"
+                    )
+
+    @staticmethod
+    def _get_ancestors(
+        classes: set[str], parents: dict[str, set[str]]
+    ) -> dict[str, set[str]]:
+        """All the ancestors (including itself, but excluding `Thing`) of each class"""
+        ancestors = {}
+        for cls in classes:
+            found = {cls}
+            to_visit = [cls]
+            while len(to_visit) > 0:
+                for parent in parents.get(to_visit.pop(), ()):
+                    if parent not in found and parent != THING:
+                        found.add(parent)
+                        to_visit.append(parent)
+            ancestors[cls] = found
+        return ancestors
+
+    def _are_disjoint(self, ancestors1: set[str], ancestors2: set[str]) -> bool:
+        return any(
+            len(self._disjoints[cls].intersection(ancestors2)) > 0
+            for cls in ancestors1
+            if cls in self._disjoints
+        )
+
+    def _is_unsatisfiable(self, ancestors: set[str]) -> bool:
+        return NOTHING in ancestors or self._are_disjoint(ancestors, ancestors)
+
+    def _get_definitions_met(self, candidate_ancestors: set[str]) -> list[str]:
+        """The defined classes the candidate falls under but doesn't yet inherit"""
+        return [
+            defined
+            for defined, positive, negative in self._definitions
+            if defined not in candidate_ancestors
+            and positive.issubset(candidate_ancestors)
+            and all(
+                self._are_disjoint(candidate_ancestors, self._ancestors[other])
+                for other in negative
+            )
+        ]
+
+
+def _serve(connection) -> None:
+    """Keep a reasoner alive, updating it with axiom changes and sending inferences"""
+    reasoner = StructuralReasoner()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        added, removed = message
+        try:
+            if len(removed) == 0:
+                # Only reasons over everything if the additions change what is known
+                connection.send(reasoner.infer_increment(added))
+            else:
+                reasoner.update(added=added, removed=removed)
+                connection.send(reasoner.infer())
+        except Exception as e:
+            connection.send(e)
+    connection.close()
+
+
+class ReasonerSession:
+    """
+    A reasoner kept warm in a long-lived local process, so that repeatedly (re-)syncing
+    ontologies doesn't pay for starting up a reasoner each time.
+
+    The session remembers which axioms the process already knows about, and only
+    sends the changes with each request. When axioms were only added, the process
+    reasons incrementally over what they introduce (cf.
+    :meth:`StructuralReasoner.infer_increment`). Pellet can't be kept alive between
+    calls, so the process runs a :class:`StructuralReasoner`.
+
+    Pass the session as the `reasoner` of a constructor or `Constructor.sync`, and
+    close it when you're done (or use it as a context manager).
+    """
+
+    def __init__(self):
+        self._connection, worker_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(worker_connection,), daemon=True
+        )
+        self._process.start()
+        worker_connection.close()
+        self._axioms = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._connection.closed
+
+    def infer(self, axioms: set[tuple]) -> list[tuple[str, str, str]]:
+        """
+        Reason over a set of axioms (cf. :func:`extract_axioms`), sending only what
+        changed since the last call to the reasoner process.
+
+        Returns:
+            (list[tuple[str, str, str]]): The inferred triples, by IRI. If axioms
+                were only added since the last call, these may be just the triples
+                inferred from the additions.
+        """
+        if self.closed:
+            raise RuntimeError("The reasoner session has already been closed")
+        self._connection.send(
+            (axioms.difference(self._axioms), self._axioms.difference(axioms))
+        )
+        self._axioms = set(axioms)
+        result = self._connection.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self, timeout: float = 5) -> None:
+        """Shut down the reasoner process."""
+        if self.closed:
+            return
+        try:
+            self._connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._connection.close()
+
+    def __enter__(self) -> ReasonerSession:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def apply_inferences(
+    onto: owl.Ontology,
+    obj_triples: list[tuple[str, str, str]],
+    data_triples: list[tuple[str, str, object, str | int]] = (),
+) -> None:
+    """
+    Add inferred triples (given by IRI) to an ontology, updating any python-side
+    entities the same way the owlready2 reasoner interface does.
+
+    Args:
+        onto (owl.Ontology): The ontology to add the inferences to.
+        obj_triples (list[tuple[str, str, str]]): Inferred object triples.
+        data_triples (list[tuple[str, str, object, str|int]]): Inferred data triples.
+    """
+    world = onto.world
+    relations = {RDF_TYPE: "individual", SUBCLASS_OF: "class"}
+
+    new_parents = defaultdict(list)
+    new_equivs = defaultdict(list)
+    entity_2_type = {}
+    obj_relations = []
+    for s, p, o in obj_triples:
+        storid = world._abbreviate(s)
+        if p in relations:
+            entity_2_type[storid] = relations[p]
+            new_parents[storid].append(world._abbreviate(o))
+        elif p == EQUIVALENT_CLASS:
+            entity_2_type[storid] = "class"
+            new_equivs[storid].append(world._abbreviate(o))
+        elif world[p] is not None:
+            obj_relations.append((storid, world[p], world._abbreviate(o)))
+
+    for storid, parents in new_parents.items():
+        # The reasoner interface expects _all_ the parents, not just the new ones
+        predicate = world._abbreviate(
+            RDF_TYPE if entity_2_type[storid] == "individual" else SUBCLASS_OF
+        )
+        parents.extend(
+            o
+            for o in world._get_obj_triples_sp_o(storid, predicate)
+            if o > 0 and o != owl.owl_named_individual and o not in parents
+        )
+
+    _apply_reasoning_results(world, onto, 0, new_parents, new_equivs, entity_2_type)
+    _apply_inferred_obj_relations(world, onto, 0, obj_relations)
+    _apply_inferred_data_relations(
+        world,
+        onto,
+        0,
+        [
+            (
+                world._abbreviate(s),
+                world[p],
+                value,
+                world._abbreviate(d) if isinstance(d, str) and d[:1] != "@" else d,
+            )
+            for s, p, value, d in data_triples
+            if world[p] is not None
+        ],
+    )
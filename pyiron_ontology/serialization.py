@@ -0,0 +1,189 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+"""
+A portable format for source trees, referencing individuals by IRI, so search results
+can be stored or sent to other processes and re-bound to an ontology there.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+
+import numpy as np
+import owlready2 as owl
+
+from pyiron_ontology.workflow import CompactNode, CompactTree, NodeTree, NodeTreeBuilder
+
+FORMAT_VERSION = 1
+_MAGIC = b"PYOT"
+_HEADER = struct.Struct("<4sBIII")  # Magic, version, nodes, IRIs, bytes of IRIs
+
+
+def tree_to_dict(tree: NodeTree | CompactNode) -> dict:
+    """
+    Flatten a tree into lists: the (unique) IRIs of the values, and for each node in
+    depth-first order the index of its value IRI, the index of its parent node (-1
+    for the root) and whether it is truncated.
+
+    Lazy trees are fully expanded to do this.
+
+    Args:
+        tree (NodeTree | CompactNode): The root of the tree.
+
+    Returns:
+        (dict): The tree, as JSON-compatible builtins.
+    """
+    if isinstance(tree, CompactNode) and tree.index == 0:
+        # Already flat, we just need to swap the lookup ids for IRIs
+        ids, values = np.unique(tree.tree.values, return_inverse=True)
+        iris = [tree.tree.lookup[i].iri for i in ids]
+        values = values.tolist()
+        parents = tree.tree.parents.tolist()
+        truncated = tree.tree.truncated.tolist()
+    else:
+        iri_indices = {}
+        values, parents, truncated = [], [], []
+        to_visit = [(tree, -1)]
+        while len(to_visit) > 0:
+            node, parent = to_visit.pop()
+            values.append(iri_indices.setdefault(node.value.iri, len(iri_indices)))
+            parents.append(parent)
+            truncated.append(bool(node.truncated))
+            index = len(values) - 1
+            to_visit.extend((child, index) for child in reversed(node.children))
+        iris = list(iri_indices)
+    return {
+        "version": FORMAT_VERSION,
+        "base_iri": tree.value.namespace.ontology.base_iri,
+        "iris": iris,
+        "values": values,
+        "parents": parents,
+        "truncated": truncated,
+    }
+
+
+def tree_from_dict(
+    data: dict, onto: owl.Ontology, compact: bool = False
+) -> NodeTree | CompactNode:
+    """
+    Re-build a tree flattened by :func:`tree_to_dict`, with the individuals of an
+    ontology.
+
+    IRIs under the base IRI of the ontology the tree was made with are looked for
+    under the base IRI of the given ontology instead, so trees can be moved between
+    copies of an ontology loaded under different names.
+
+    Args:
+        data (dict): The flattened tree.
+        onto (owl.Ontology): The ontology to find the individuals in.
+        compact (bool): Whether to build a `CompactTree` instead of `NodeTree`s.
+            (Default is False.)
+
+    Returns:
+        (NodeTree | CompactNode): The root of the tree.
+
+    Raises:
+        (ValueError): If the format version is unknown, or an individual can't be
+            found in the ontology.
+    """
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Expected a tree of format version {FORMAT_VERSION}, but got "
+            f"{data.get('version')}"
+        )
+    base_iri = data["base_iri"]
+    lookup = []
+    for iri in data["iris"]:
+        if iri.startswith(base_iri):
+            iri = onto.base_iri + iri[len(base_iri) :]
+        individual = onto.world[iri]
+        if individual is None:
+            raise ValueError(f"Could not find {iri} in {onto.base_iri}")
+        lookup.append(individual)
+
+    builder = CompactTree(lookup) if compact else NodeTreeBuilder(lookup)
+    nodes = []
+    for value, parent, truncated in zip(
+        data["values"], data["parents"], data["truncated"]
+    ):
+        node = builder.add(value, None if parent < 0 else nodes[parent])
+        nodes.append(node)
+        if truncated:
+            builder.truncate(node)
+    return builder.finalize().root if compact else nodes[0]
+
+
+def dumps(tree: NodeTree | CompactNode, binary: bool = False) -> str | bytes:
+    """
+    Serialize a tree.
+
+    Args:
+        tree (NodeTree | CompactNode): The root of the tree.
+        binary (bool): Whether to pack the node arrays as bytes instead of writing
+            JSON. (Default is False.)
+
+    Returns:
+        (str | bytes): The JSON string, or the binary encoding.
+    """
+    data = tree_to_dict(tree)
+    if not binary:
+        return json.dumps(data)
+    iris = "\n".join([data["base_iri"]] + data["iris"]).encode("utf-8")
+    return b"".join(
+        [
+            _HEADER.pack(
+                _MAGIC,
+                FORMAT_VERSION,
+                len(data["values"]),
+                len(data["iris"]),
+                len(iris),
+            ),
+            iris,
+            np.asarray(data["values"], dtype="<i4").tobytes(),
+            np.asarray(data["parents"], dtype="<i4").tobytes(),
+            np.asarray(data["truncated"], dtype=bool).tobytes(),
+        ]
+    )
+
+
+def loads(
+    serialized: str | bytes, onto: owl.Ontology, compact: bool = False
+) -> NodeTree | CompactNode:
+    """
+    Deserialize a tree serialized by :func:`dumps`, with the individuals of an
+    ontology.
+
+    Args:
+        serialized (str | bytes): The JSON string, or the binary encoding.
+        onto (owl.Ontology): The ontology to find the individuals in.
+        compact (bool): Whether to build a `CompactTree` instead of `NodeTree`s.
+            (Default is False.)
+
+    Returns:
+        (NodeTree | CompactNode): The root of the tree.
+    """
+    if isinstance(serialized, str) or not serialized.startswith(_MAGIC):
+        return tree_from_dict(json.loads(serialized), onto, compact=compact)
+
+    magic, version, n_nodes, n_iris, n_bytes = _HEADER.unpack_from(serialized)
+    offset = _HEADER.size
+    base_iri, *iris = serialized[offset : offset + n_bytes].decode("utf-8").split("\n")
+    offset += n_bytes
+
+    def read(dtype, itemsize):
+        nonlocal offset
+        array = np.frombuffer(serialized, dtype=dtype, count=n_nodes, offset=offset)
+        offset += n_nodes * itemsize
+        return array.tolist()
+
+    data = {
+        "version": version,
+        "base_iri": base_iri,
+        "iris": iris[:n_iris],
+        "values": read("<i4", 4),
+        "parents": read("<i4", 4),
+        "truncated": read(bool, 1),
+    }
+    return tree_from_dict(data, onto, compact=compact)
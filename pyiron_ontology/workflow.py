@@ -5,7 +5,13 @@
 A tree structure for ontologically-informed workflows.
 """
 
-from numpy import argsort
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Optional, Sequence, TextIO
+
+import numpy as np
 
 
 class NodeTree:
@@ -13,16 +19,274 @@ class NodeTree:
         self.value = value
         self.children = []
         self.parent = parent
+        self.truncated = False
         if parent is not None:
             parent.children.append(self)
 
-    def render(self, depth=0, order_alphabetically=True):
-        tabs = "".join(["  "] * depth)
-        print(f"{tabs}{self.value.name}")
-        children = (
-            [self.children[n] for n in argsort([str(c.value) for c in self.children])]
-            if order_alphabetically
-            else self.children
+    def truncate(self):
+        """Flag this node, and so everything above it, as incompletely searched."""
+        node = self
+        while node is not None and not node.truncated:
+            node.truncated = True
+            node = node.parent
+
+    def render(
+        self,
+        depth=0,
+        order_alphabetically=True,
+        stream: Optional[TextIO] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        chunk_size: int = 1000,
+    ):
+        """
+        Write the names of the values in the tree, indented by depth.
+
+        Args:
+            depth (int): The indentation depth to start at.
+            order_alphabetically (bool): Whether to sort children by value.
+            stream (TextIO | None): Where to write. (Default is None, standard out.)
+            max_depth (int | None): How many levels below this one to write.
+            max_nodes (int | None): The most nodes to write, after which a "..."
+                line marks that the rest was skipped.
+            chunk_size (int): How many lines to write to the stream at once.
+        """
+        stream = sys.stdout if stream is None else stream
+        keys = {}  # Values repeat a lot in source trees, so sort keys are cached
+
+        def sort_key(node):
+            try:
+                return keys[node.value]
+            except KeyError:
+                key = keys[node.value] = str(node.value)
+                return key
+
+        lines = []
+        n_nodes = 0
+        to_render = [(self, depth)]
+        while len(to_render) > 0:
+            node, node_depth = to_render.pop()
+            if max_nodes is not None and n_nodes >= max_nodes:
+                lines.append(f"{'  ' * node_depth}...")
+                break
+            lines.append(f"{'  ' * node_depth}{node.value.name}")
+            n_nodes += 1
+            if len(lines) >= chunk_size:
+                stream.write("\n".join(lines) + "\n")
+                lines = []
+
+            if max_depth is None or node_depth - depth < max_depth:
+                children = node.children
+                if order_alphabetically:
+                    children = sorted(children, key=sort_key)
+                to_render.extend((c, node_depth + 1) for c in reversed(children))
+        if len(lines) > 0:
+            stream.write("\n".join(lines) + "\n")
+
+
+class NodeTreeBuilder:
+    """
+    Grows a node tree from value ids, the same way a `CompactTree` is grown.
+
+    Args:
+        lookup (Sequence): The values, indexed by id.
+    """
+
+    def __init__(self, lookup: Sequence):
+        self.lookup = lookup
+
+    def add(self, value_id: int, parent: Optional[NodeTree] = None) -> NodeTree:
+        return NodeTree(self.lookup[value_id], parent=parent)
+
+    @staticmethod
+    def truncate(node: NodeTree):
+        node.truncate()
+
+
+class CompactTree:
+    """
+    A tree stored as arrays of value ids, parent indices and truncation flags (with
+    the root at index 0), for search results too big to hold as one python object
+    per node.
+
+    Grow it with :meth:`add` and :meth:`truncate`, then :meth:`finalize` it to
+    index the children of each node. Navigate it like a `NodeTree` through the
+    :attr:`root` view.
+
+    Args:
+        lookup (Sequence): The values, indexed by id.
+    """
+
+    __slots__ = (
+        "lookup",
+        "values",
+        "parents",
+        "truncated",
+        "child_offsets",
+        "child_indices",
+    )
+
+    def __init__(self, lookup: Sequence):
+        self.lookup = lookup
+        self.values = array("i")
+        self.parents = array("i")
+        self.truncated = array("b")
+        self.child_offsets = None
+        self.child_indices = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value_id: int, parent: Optional[int] = None) -> int:
+        """
+        Add a node.
+
+        Returns:
+            (int): The index of the new node.
+        """
+        self.values.append(value_id)
+        self.parents.append(-1 if parent is None else parent)
+        self.truncated.append(False)
+        return len(self.values) - 1
+
+    def truncate(self, index: int):
+        """Flag a node, and so everything above it, as incompletely searched."""
+        while index >= 0 and not self.truncated[index]:
+            self.truncated[index] = True
+            index = self.parents[index]
+
+    def finalize(self) -> CompactTree:
+        """Freeze the arrays and index the children of each node."""
+        self.values = np.frombuffer(self.values, dtype=np.int32)
+        self.parents = np.frombuffer(self.parents, dtype=np.int32)
+        self.truncated = np.frombuffer(self.truncated, dtype=bool)
+        # Group nodes by parent, keeping them in the order they were added
+        self.child_indices = (
+            np.argsort(self.parents[1:], kind="stable").astype(np.int32) + 1
+        )
+        self.child_offsets = np.zeros(len(self) + 1, dtype=np.int32)
+        np.cumsum(
+            np.bincount(self.parents[1:], minlength=len(self)),
+            out=self.child_offsets[1:],
         )
-        for child in children:
-            child.render(depth=depth + 1)
+        return self
+
+    @property
+    def root(self) -> CompactNode:
+        return CompactNode(self, 0)
+
+
+class CompactNode:
+    """
+    A view of one node of a finalized `CompactTree`, navigable like a `NodeTree`.
+    """
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: CompactTree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def value(self):
+        return self.tree.lookup[self.tree.values[self.index]]
+
+    @property
+    def children(self) -> list[CompactNode]:
+        offsets = self.tree.child_offsets
+        return [
+            CompactNode(self.tree, int(i))
+            for i in self.tree.child_indices[
+                offsets[self.index] : offsets[self.index + 1]
+            ]
+        ]
+
+    @property
+    def parent(self) -> Optional[CompactNode]:
+        parent = self.tree.parents[self.index]
+        return None if parent < 0 else CompactNode(self.tree, int(parent))
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.tree.truncated[self.index])
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CompactNode)
+            and self.tree is other.tree
+            and self.index == other.index
+        )
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    render = NodeTree.render
+
+
+class LazyNodeTree(NodeTree):
+    """
+    A node tree whose children are only found the first time they are accessed.
+
+    Args:
+        value: The value of the node.
+        parent (NodeTree | None): The parent node.
+        expand (callable | None): A function taking this node, which populates its
+            children. (Default is None, a leaf.)
+    """
+
+    def __init__(self, value, parent=None, expand=None):
+        self._expand = expand
+        super().__init__(value, parent=parent)
+
+    @property
+    def children(self):
+        if self._expand is not None:
+            expand, self._expand = self._expand, None
+            expand(self)
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+
+    @property
+    def expanded(self) -> bool:
+        """Whether the children of this node have been found yet."""
+        return self._expand is None
+
+
+class SourceNode:
+    """
+    A node in a graph of sources, where upstream searches that are reached in the same
+    way from many places are only made (and stored) once and then shared.
+
+    Args:
+        value: The individual whose sources this node holds.
+        requirements (tuple | None): The additional requirements the sources were
+            searched with.
+    """
+
+    def __init__(self, value, requirements=None):
+        self.value = value
+        self.requirements = requirements
+        self.sources = []
+
+    def to_tree(self, parent=None) -> NodeTree:
+        """
+        Expand the (shared) graph from this node into a tree, without following
+        cycles.
+        """
+        root = NodeTree(self.value, parent=parent)
+        to_expand = [(self, root, frozenset([self.value]))]
+        while len(to_expand) > 0:
+            graph_node, tree_node, path = to_expand.pop()
+            for source in graph_node.sources:
+                if source.value not in path:
+                    to_expand.append(
+                        (
+                            source,
+                            NodeTree(source.value, parent=tree_node),
+                            path.union([source.value]),
+                        )
+                    )
+        return root
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pyiron_ontology.cache import fingerprint
+from pyiron_ontology.example.constructor import ExampleOntology
+
+
+class TestCache(TestCase):
+    def test_reasoned_ontology_is_reused(self):
+        with TemporaryDirectory() as cache_dir:
+            onto = ExampleOntology(
+                name="cached_example", cache_dir=cache_dir, reasoner="structural"
+            ).onto
+            self.assertEqual(
+                1,
+                len(list(Path(cache_dir).glob("cached_example_*.sqlite3"))),
+                msg="Reasoning should leave a snapshot of the reasoned ontology",
+            )
+
+            # The same declarations in a fresh process must not need the reasoner
+            script = textwrap.dedent(f"""
+                from unittest import mock
+                from pyiron_ontology.example.constructor import ExampleOntology
+
+                with mock.patch(
+                    "pyiron_ontology.reasoner.StructuralReasoner.infer",
+                    side_effect=AssertionError("Reasoner ran despite the cache"),
+                ):
+                    onto = ExampleOntology(
+                        name="cached_example",
+                        cache_dir={cache_dir!r},
+                        reasoner="structural",
+                    ).onto
+                print(sorted(o.name for o in onto.output4_inp.get_sources()))
+                """)
+            result = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True
+            )
+            self.assertEqual(0, result.returncode, msg=result.stderr)
+            self.assertEqual(
+                str(sorted(o.name for o in onto.output4_inp.get_sources())),
+                result.stdout.strip(),
+            )
+
+    def test_fingerprint(self):
+        onto = ExampleOntology(name="fingerprinted_example", reasoner="structural").onto
+        self.assertEqual(fingerprint(onto), fingerprint(onto))
+        self.assertNotEqual(
+            fingerprint(onto),
+            fingerprint(onto, infer_property_values=False),
+            msg="Reasoner settings should be part of the fingerprint",
+        )
@@ -0,0 +1,136 @@
+from unittest import TestCase
+
+import numpy as np
+import owlready2 as owl
+
+from pyiron_ontology.example.constructor import ExampleOntology
+from pyiron_ontology.graph import CSR
+
+
+class TestCSR(TestCase):
+    def test_rows(self):
+        csr = CSR([[1, 2], [], [0]])
+        self.assertEqual(3, len(csr))
+        self.assertListEqual([1, 2], csr[0].tolist())
+        self.assertListEqual([], csr[1].tolist())
+        self.assertListEqual([0], csr[2].tolist())
+
+    def test_extend(self):
+        csr = CSR([[1, 2]])
+        csr.extend([[], [3]])
+        self.assertEqual(3, len(csr))
+        self.assertListEqual([1, 2], csr[0].tolist())
+        self.assertListEqual([], csr[1].tolist())
+        self.assertListEqual([3], csr[2].tolist())
+
+
+class TestCompiledGraph(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.constructor = ExampleOntology(
+            name="compiled_example", reasoner="structural"
+        )
+        cls.onto = cls.constructor.onto
+
+    def test_matches_individuals(self):
+        graph = self.constructor.graph
+        for individual in graph.individuals:
+            for requirements in [None, [], [self.onto.output4_inp.requirements[0]]]:
+                with self.subTest(f"{individual.name}, {requirements}"):
+                    if isinstance(individual, self.onto.Input):
+                        sources, passed = (
+                            individual.get_sources_and_passed_requirements(
+                                additional_requirements=requirements
+                            )
+                        )
+                    else:
+                        sources, passed = (
+                            individual.get_sources(
+                                additional_requirements=requirements
+                            ),
+                            requirements,
+                        )
+                    ids, passed_ids = graph.get_sources_and_requirements(
+                        graph.ids[individual],
+                        None if requirements is None else graph.ids_of(requirements),
+                    )
+                    self.assertListEqual(list(sources), graph.individuals_of(ids))
+                    if passed is not None:
+                        self.assertListEqual(
+                            list(passed), graph.individuals_of(passed_ids)
+                        )
+
+    def test_transient_generics(self):
+        graph = self.constructor.graph
+        n_individuals = len(graph.individuals)
+        new_requirement = self.onto.Inp2()
+        new_root = self.onto.InpMid()
+        try:
+            self.assertNotIn(new_requirement, graph.ids)
+            tree = self.onto.output4_out.get_source_tree(
+                additional_requirements=[new_requirement]
+            )
+            self.assertGreater(len(tree.children), 0)
+            compact = new_root.get_source_tree(compact=True)
+            self.assertIs(new_root, compact.value)
+            self.assertSetEqual(
+                set(new_root.get_sources()),
+                {child.value for child in compact.children},
+            )
+            self.assertGreater(len(compact.children), 0)
+            self.assertIs(
+                graph,
+                self.constructor.graph,
+                msg="Unknown generics should not recompile the graph",
+            )
+            self.assertEqual(
+                n_individuals,
+                len(graph.individuals),
+                msg="Generics made on the fly should only live for the search",
+            )
+            self.assertDictEqual({}, graph._transient)
+        finally:
+            for entity in [new_requirement, new_root]:
+                owl.destroy_entity(entity)
+
+    def test_matrices(self):
+        graph = self.constructor.graph
+        generics = list(self.onto.Generic.instances())
+        self.assertEqual(
+            len(generics),
+            len(graph.things_matrix),
+            msg="Class membership should only be stored for generics",
+        )
+        self.assertEqual(len(generics), len(graph.disjoints_matrix))
+        for generic in generics:
+            with self.subTest(generic.name):
+                i = graph.ids[generic]
+                row = graph.generic_rows[i]
+                self.assertListEqual(
+                    graph.class_index.ids_in(graph.things[i]),
+                    np.flatnonzero(graph.things_matrix[row]).tolist(),
+                )
+        self.assertTrue(
+            all(
+                graph.generic_rows[graph.ids[o]] == -1 for o in self.onto.IO.instances()
+            )
+        )
+
+    def test_satisfying(self):
+        graph = self.constructor.graph
+        outputs = list(self.onto.Output.instances())
+        for requirement in self.onto.Generic.instances():
+            with self.subTest(requirement.name):
+                self.assertListEqual(
+                    [o for o in outputs if o.satisfies([requirement])],
+                    graph.individuals_of(
+                        graph.satisfying(
+                            graph.ids_of(outputs), graph.ids_of([requirement])
+                        )
+                    ),
+                )
+        self.assertListEqual(
+            graph.ids_of(outputs),
+            graph.satisfying(graph.ids_of(outputs), []),
+            msg="Everything satisfies no requirements",
+        )
@@ -0,0 +1,127 @@
+from unittest import TestCase
+
+import owlready2 as owl
+
+from pyiron_ontology.example.constructor import ExampleOntology
+from pyiron_ontology.index import ClassIndex
+
+
+class TestClassIndex(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.constructor = ExampleOntology(name="indexed_example", reasoner="structural")
+        cls.onto = cls.constructor.onto
+
+    def test_ids(self):
+        index = self.constructor.class_index
+        self.assertListEqual(
+            list(range(len(index.classes))),
+            [index.ids[c] for c in index.classes],
+            msg="Ids should be dense",
+        )
+        self.assertEqual(
+            index.ids[self.onto.Input],
+            index.get_id(self.onto.Input),
+            msg="Known classes should keep their id",
+        )
+
+        fresh = ClassIndex()
+        self.assertListEqual([owl.Thing], fresh.classes)
+        fresh.get_id(self.onto.Generic)
+        self.assertTrue(
+            set(self.onto.Generic.ancestors()).issubset(fresh.classes),
+            msg="Unknown classes should get added along with their ancestors",
+        )
+
+    def test_representation_info(self):
+        for generic in self.onto.Generic.instances():
+            with self.subTest(generic.name):
+                things, disjoints = generic.representation_info
+                self.assertSetEqual(
+                    set(generic.only_get_thing_classes(generic.INDIRECT_is_a)),
+                    set(things),
+                )
+                self.assertSetEqual(generic.indirect_disjoints_set, disjoints)
+
+    def test_bitwise_checks(self):
+        index = self.constructor.class_index
+        i2 = index.representation_masks(self.onto.output4_inp.requirements[0])
+        i1 = index.representation_masks(self.onto.input1_out.generic)
+        self.assertTrue(index.compatible(*i2, *i2))
+        self.assertFalse(
+            index.compatible(*i1, *i2),
+            msg="I1 and I2 are disjoint",
+        )
+        self.assertTrue(index.as_or_more_specific(i2[0], *i2))
+        self.assertFalse(index.as_or_more_specific(i1[0], *i2))
+
+    def test_masks_by_classes(self):
+        index = self.constructor.class_index
+        known = self.onto.Inp1.instances()[0]
+        masks = index.representation_masks(known)
+        n_cached = len(index._masks_by_classes)
+        fresh = [self.onto.Inp1() for _ in range(3)]
+        try:
+            for individual in fresh:
+                self.assertTupleEqual(masks, index.representation_masks(individual))
+            self.assertEqual(
+                n_cached,
+                len(index._masks_by_classes),
+                msg="Individuals of the same classes should share their masks",
+            )
+        finally:
+            for individual in fresh:
+                owl.destroy_entity(individual)
+
+    def test_io_index(self):
+        for generic in self.onto.Generic.instances():
+            with self.subTest(generic.name):
+                scanned = {
+                    io
+                    for cls in generic.only_get_thing_classes(generic.is_a)
+                    for instance in cls.instances()
+                    for io in instance.parameters
+                }
+                self.assertSetEqual(scanned, set(generic.indirect_io))
+
+
+class TestOptionsCache(TestCase):
+    def test_invalidation(self):
+        constructor = ExampleOntology(name="options_example", reasoner="structural")
+        onto = constructor.onto
+        function = onto.output4
+        options = function.options
+        self.assertListEqual(options, onto.output4_out.options)
+
+        with onto:
+            onto.Input(
+                name="output4_extra", optional_input_of=function, generic=onto.Inp1()
+            )
+        self.assertListEqual(
+            options, function.options, msg="Options are cached until modification"
+        )
+        version = constructor.version
+        constructor.mark_modified()
+        self.assertGreater(constructor.version, version)
+        self.assertIn(onto.output4_extra.generic, function.options)
+
+
+class TestRequirementsMemo(TestCase):
+    def test_memo(self):
+        constructor = ExampleOntology(name="memo_example", reasoner="structural")
+        onto = constructor.onto
+        inp = onto.middle2_inp1
+        additional = onto.output4_inp.requirements
+
+        requirements = inp.get_requirements(additional_requirements=additional)
+        hits = constructor._requirements_memo.cache_info().hits
+        requirements.append(onto.Inp1())
+        self.assertListEqual(
+            requirements[:-1],
+            inp.get_requirements(additional_requirements=additional),
+            msg="Modifying the returned list should not touch the memo",
+        )
+        self.assertEqual(hits + 1, constructor._requirements_memo.cache_info().hits)
+
+        constructor.mark_modified()
+        self.assertEqual(0, constructor._requirements_memo.cache_info().currsize)
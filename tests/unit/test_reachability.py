@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from pyiron_ontology.example.constructor import ExampleOntology
+
+
+class TestReachability(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.constructor = ExampleOntology(
+            name="reachable_example", reasoner="structural"
+        )
+        cls.onto = cls.constructor.onto
+
+    def reachable(self, *available):
+        return {o.name for o in self.constructor.get_reachable_outputs(*available)}
+
+    def test_nothing_available(self):
+        self.assertSetEqual(set(), self.reachable())
+
+    def test_requirements(self):
+        with_inp1 = self.reachable(self.onto.Inp1())
+        with_inp2 = self.reachable(self.onto.Inp2())
+        self.assertIn("output3_out", with_inp1, msg="Output3 requires Inp1")
+        self.assertNotIn("output3_out", with_inp2, msg="Output3 requires Inp1")
+        self.assertIn(
+            "output4_out",
+            with_inp2,
+            msg="Output4 requires Inp2 transitively through its middle input",
+        )
+        self.assertNotIn(
+            "output4_out",
+            with_inp1,
+            msg="Even though Inp1 makes the middle output output4 takes",
+        )
+        self.assertIn("middle2_out1", with_inp1)
+        self.assertSetEqual(
+            with_inp1.union(with_inp2),
+            self.reachable(self.onto.Inp1(), self.onto.Inp2()),
+        )
+
+    def test_available_outputs(self):
+        self.assertSetEqual(
+            self.reachable(self.onto.Inp2()),
+            self.reachable(self.onto.input2_out),
+            msg="Outputs we have should work like the inputs that make them",
+        )
@@ -0,0 +1,247 @@
+import multiprocessing
+import threading
+from unittest import TestCase, mock
+
+import owlready2 as owl
+
+from pyiron_ontology.constructor import Constructor
+from pyiron_ontology.example.constructor import ExampleOntology
+from pyiron_ontology.reasoner import (
+    EQUIVALENT_CLASS,
+    NOTHING,
+    RDF_TYPE,
+    SUBCLASS_OF,
+    ReasonerSession,
+    StructuralReasoner,
+    _serve,
+)
+
+
+class TestStructuralReasoner(TestCase):
+    def setUp(self):
+        self.axioms = {
+            ("subclass", "Defected", "Structure"),
+            ("subclass", "Bulk", "Structure"),
+            ("equivalent", "Bulk", frozenset(["Structure"]), frozenset(["Defected"])),
+            ("subclass", "OneD", "Dimensional"),
+            ("subclass", "ThreeD", "Dimensional"),
+            ("disjoint", frozenset(["OneD", "ThreeD"])),
+            ("disjoint", frozenset(["Perfect", "Defected"])),
+            ("subclass", "Perfect", "Structure"),
+            ("type", "some_structure", "Structure"),
+            ("type", "perfect_structure", "Perfect"),
+            ("disjoint", frozenset(["Pristine", "Defected"])),
+            ("type", "pristine_structure", "Structure"),
+            ("type", "pristine_structure", "Pristine"),
+        }
+
+    def test_defined_classes(self):
+        inferred = StructuralReasoner(self.axioms).infer()
+        self.assertIn(("Perfect", SUBCLASS_OF, "Bulk"), inferred)
+        self.assertIn(("pristine_structure", RDF_TYPE, "Bulk"), inferred)
+        self.assertNotIn(
+            ("some_structure", RDF_TYPE, "Bulk"),
+            inferred,
+            msg="Without knowing it is not defected, a structure is not bulk",
+        )
+
+    def test_unsatisfiable_classes(self):
+        reasoner = StructuralReasoner(self.axioms)
+        reasoner.update(
+            added=[
+                ("subclass", "Line", "OneD"),
+                ("subclass", "Line", "ThreeD"),
+                ("subclass", "Thin", "Line"),
+            ]
+        )
+        inferred = reasoner.infer()
+        self.assertIn(("Line", EQUIVALENT_CLASS, NOTHING), inferred)
+        self.assertIn(
+            ("Thin", EQUIVALENT_CLASS, NOTHING),
+            inferred,
+            msg="Children of unsatisfiable classes are unsatisfiable too",
+        )
+
+    def test_inconsistent_individuals(self):
+        reasoner = StructuralReasoner(self.axioms)
+        reasoner.update(added=[("type", "some_structure", "Defected")])
+        reasoner.infer()
+        reasoner.update(added=[("type", "some_structure", "Perfect")])
+        with self.assertRaises(owl.OwlReadyInconsistentOntologyError):
+            reasoner.infer()
+
+
+class TestStructuralSync(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.onto = ExampleOntology(
+            name="structurally_reasoned_example", reasoner="structural"
+        ).onto
+
+    def test_matches_pellet(self):
+        self.assertSetEqual(
+            {self.onto.middle2_out1},
+            set(self.onto.output4_inp.get_sources()),
+        )
+        self.assertSetEqual(
+            {self.onto.input2_out},
+            set(
+                self.onto.middle2_inp1.get_sources(
+                    additional_requirements=self.onto.output4_inp.requirements
+                )
+            ),
+        )
+
+    def test_resync(self):
+        constructor = ExampleOntology(name="resynced_example", reasoner="structural")
+        with mock.patch.object(
+            owl,
+            "sync_reasoner_pellet",
+            side_effect=AssertionError("Should sync with the constructor's reasoner"),
+        ):
+            constructor.sync()
+        self.assertSetEqual(
+            {constructor.onto.middle2_out1},
+            set(constructor.onto.output4_inp.get_sources()),
+        )
+
+
+class TestIncrementalSync(TestCase):
+    def test_sync_increment(self):
+        constructor = ExampleOntology(
+            name="incrementally_reasoned_example", reasoner="structural"
+        )
+        onto = constructor.onto
+
+        with onto:
+            new_middle = onto.Function("new_middle")
+            onto.Input(
+                name="new_middle_inp",
+                mandatory_input_of=new_middle,
+                generic=onto.InpMid(),
+            )
+            onto.Output(
+                name="new_middle_out",
+                output_of=new_middle,
+                generic=onto.MidOut2A(),
+            )
+
+        graph = constructor.graph
+        with (
+            mock.patch.object(
+                StructuralReasoner,
+                "infer",
+                side_effect=AssertionError("Only the increment should be reasoned"),
+            ),
+            mock.patch.object(
+                Constructor,
+                "compile",
+                side_effect=AssertionError("The graph should only be extended"),
+            ),
+        ):
+            constructor.sync_increment(new_middle)
+        self.assertIs(graph, constructor.graph)
+        self.assertIn(onto.new_middle_out, onto.output1_inp.get_sources())
+
+        with onto:
+            broken = onto.Function("broken")
+            broken_out = onto.Output(
+                name="broken_out",
+                output_of=broken,
+                generic=onto.Generic(is_a=[onto.MidOut1, onto.MidOut2]),
+            )
+        try:
+            with self.assertRaises(owl.OwlReadyInconsistentOntologyError):
+                constructor.sync_increment(broken)
+        finally:
+            # Don't leave an inconsistent world behind for other tests
+            for entity in [broken_out.generic, broken_out, broken]:
+                owl.destroy_entity(entity)
+
+
+class TestStructuralSyncErrors(TestCase):
+    def test_inconsistent_classes(self):
+        class Inconsistent(Constructor):
+            def _make_specific_declarations(self):
+                with self.onto:
+
+                    class A(self.onto.Generic):
+                        pass
+
+                    class B(self.onto.Generic):
+                        pass
+
+                    owl.AllDisjoint([A, B])
+
+                    class C(A, B):
+                        pass
+
+        with self.assertRaises(RuntimeError):
+            Inconsistent("inconsistent", strict=True, reasoner="structural")
+
+    def test_unknown_reasoner(self):
+        with self.assertRaises(ValueError):
+            Constructor("unreasonable", reasoner="not_a_reasoner")
+
+
+class TestReasonerSession(TestCase):
+    def test_session(self):
+        with ReasonerSession() as session:
+            onto = ExampleOntology(name="session_example", reasoner=session).onto
+            self.assertSetEqual(
+                {onto.middle2_out1}, set(onto.output4_inp.get_sources())
+            )
+
+            axioms = {
+                ("subclass", "Bulk", "Structure"),
+                ("disjoint", frozenset(["Bulk", "Defected"])),
+                ("type", "structure", "Bulk"),
+            }
+            self.assertListEqual([], session.infer(axioms))
+            with self.assertRaises(
+                owl.OwlReadyInconsistentOntologyError,
+                msg="Errors in the reasoner process should reach us",
+            ):
+                session.infer(axioms.union([("type", "structure", "Defected")]))
+            self.assertListEqual(
+                [],
+                session.infer(axioms),
+                msg="The session should survive reasoning errors",
+            )
+            process = session._process
+        self.assertTrue(session.closed)
+        self.assertFalse(process.is_alive())
+
+    def test_increments(self):
+        infer = StructuralReasoner.infer
+        calls = []
+
+        def counting_infer(reasoner):
+            calls.append(reasoner)
+            return infer(reasoner)
+
+        connection, worker_connection = multiprocessing.Pipe()
+        with mock.patch.object(StructuralReasoner, "infer", counting_infer):
+            worker = threading.Thread(target=_serve, args=(worker_connection,))
+            worker.start()
+            axioms = {
+                ("subclass", "Bulk", "Structure"),
+                ("disjoint", frozenset(["Bulk", "Defected"])),
+                ("type", "structure", "Bulk"),
+            }
+            connection.send((axioms, set()))
+            connection.recv()
+            connection.send(({("type", "other", "Bulk")}, set()))
+            self.assertListEqual([], connection.recv())
+            self.assertEqual(1, len(calls), msg="Additions should be incremental")
+
+            connection.send(({("type", "other", "Defected")}, set()))
+            self.assertIsInstance(
+                connection.recv(), owl.OwlReadyInconsistentOntologyError
+            )
+            connection.send((set(), {("type", "other", "Defected")}))
+            self.assertListEqual([], connection.recv())
+            self.assertEqual(2, len(calls), msg="Removals need everything re-done")
+
+            connection.send(None)
+            worker.join()
@@ -0,0 +1,368 @@
+import re
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+import numpy as np
+import pandas as pd
+
+import pyiron_ontology
+from pyiron_ontology.atomistics.reasoning import AtomisticsReasoner
+
+
+class FakeJob(dict):
+    """Just enough of an inspected pyiron job to read from"""
+
+    def __init__(self, data, read):
+        super().__init__(data)
+        self.project_hdf5 = self
+        self.read = read
+
+    def __getitem__(self, item):
+        self.read.append(item)
+        return super().__getitem__(item)
+
+    def list_groups(self):
+        return list({k.split("/")[0] for k in self if "/" in k})
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def get_items_dict(self, item_dict):
+        self.queries.append(item_dict)
+
+        def matches(value, pattern):
+            if isinstance(pattern, list):
+                return any(matches(value, p) for p in pattern)
+            regex = "".join(".*" if c == "%" else re.escape(c) for c in str(pattern))
+            return re.fullmatch(regex, str(value)) is not None
+
+        return [
+            row
+            for row in self.rows
+            if all(matches(row[k], pattern) for k, pattern in item_dict.items())
+        ]
+
+
+class FakeProject:
+    def __init__(self, path, rows, jobs):
+        self.path = path
+        self.db = FakeDatabase(rows)
+        self.jobs = jobs
+        self.inspected = []
+        self.read = []
+
+    def inspect(self, job_id):
+        self.inspected.append(job_id)
+        return FakeJob(self.jobs[job_id], self.read)
+
+
+def murnaghan_project(n_jobs=20):
+    rows, jobs = [], {}
+    for i in range(n_jobs):
+        formula = "Cu108" if i % 2 == 0 else "Al108"
+        rows.append(
+            {
+                "id": i,
+                "chemicalformula": formula,
+                "hamilton": "Murnaghan",
+                "hamversion": "0.3.0",
+                "project": "/fake/project/",
+                "status": "finished",
+                "masterid": None,
+            }
+        )
+        if i < n_jobs // 2:
+            # Only some murnaghans have their strained lammps jobs in the database
+            rows.append(
+                {
+                    "id": 1000 + i,
+                    "chemicalformula": formula,
+                    "hamilton": "Lammps",
+                    "hamversion": "0.1",
+                    "project": f"/fake/project/murn{i}_hdf5/",
+                    "status": "finished",
+                    "masterid": i,
+                }
+            )
+        jobs[i] = {
+            "TYPE": "<class 'pyiron_atomistics.atomistics.master.murnaghan.Murnaghan'>",
+            "ref_job/TYPE": "<class 'pyiron_atomistics.lammps.lammps.Lammps'>",
+            "output/equilibrium_bulk_modulus": 100.0 + i,
+            "output/equilibrium_b_prime": 4.0 + i / 100,
+        }
+    rows.append(
+        {
+            "id": n_jobs,
+            "chemicalformula": "Cu108",
+            "hamilton": "Lammps",
+            "hamversion": "0.1",
+            "project": "/fake/project/",
+            "status": "finished",
+            "masterid": None,
+        }
+    )
+    return FakeProject("/fake/project/", rows, jobs)
+
+
+class TestSearchDatabase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.onto = pyiron_ontology.AtomisticsOntology(
+            name="searched_atomistics", reasoner="structural"
+        ).onto
+        cls.reasoner = AtomisticsReasoner(cls.onto)
+
+    def test_search(self):
+        project = murnaghan_project()
+        df = self.reasoner.search_database_for_property(
+            self.onto.BulkModulus(), project, max_workers=4
+        )
+        self.assertEqual(
+            1,
+            len([q for q in project.db.queries if "hamilton" in q]),
+            msg="Expected a single query for the jobs",
+        )
+        self.assertEqual(20, len(df))
+        self.assertListEqual(
+            ["Chemical Formula", f"{self.onto.BulkModulus}", "unit", "Engine"],
+            list(df.columns),
+        )
+        self.assertTrue(np.allclose(100.0 + np.arange(20), df.iloc[:, 1]))
+        self.assertSetEqual({"GPa"}, set(df["unit"]))
+        self.assertSetEqual({"Lammps"}, set(df["Engine"]))
+
+        alloy = self.reasoner.search_database_for_property(
+            self.onto.BulkModulus(), project, select_alloy="Al"
+        )
+        self.assertSetEqual({"Al108"}, set(alloy["Chemical Formula"]))
+
+        empty = self.reasoner.search_database_for_property(
+            self.onto.BulkModulus(), project, select_alloy="Ni"
+        )
+        self.assertEqual(0, len(empty))
+        self.assertListEqual(list(df.columns), list(empty.columns))
+
+    def test_chunks(self):
+        project = murnaghan_project()
+        full = self.reasoner.search_database_for_property(self.onto.BPrime(), project)
+        chunks = list(
+            self.reasoner.iter_database_for_property(
+                self.onto.BPrime(), project, chunk_size=6
+            )
+        )
+        self.assertListEqual([6, 6, 6, 2], [len(c) for c in chunks])
+        self.assertTrue(full.equals(pd.concat(chunks)))
+
+        project.inspected.clear()
+        paged = list(
+            self.reasoner.iter_database_for_property(
+                self.onto.BPrime(), project, chunk_size=3, limit=5, offset=4
+            )
+        )
+        self.assertListEqual([3, 2], [len(c) for c in paged])
+        self.assertTrue(full.iloc[4:9].equals(pd.concat(paged)))
+        self.assertListEqual(
+            list(range(4, 9)),
+            sorted(project.inspected),
+            msg="Only the jobs on the page should be read",
+        )
+        self.assertTrue(
+            full.iloc[4:9].equals(
+                self.reasoner.search_database_for_property(
+                    self.onto.BPrime(), project, limit=5, offset=4
+                )
+            )
+        )
+        self.assertListEqual(
+            [],
+            list(
+                self.reasoner.iter_database_for_property(
+                    self.onto.BPrime(), project, offset=100
+                )
+            ),
+        )
+
+    def test_cache(self):
+        project = murnaghan_project()
+        with TemporaryDirectory() as cache_dir:
+            searched = AtomisticsReasoner(
+                self.onto, cache_dir=cache_dir
+            ).search_database_for_property(
+                self.onto.BulkModulus(), project, select_alloy="Cu"
+            )
+            self.assertEqual(10, len(project.inspected))
+
+            reasoner = AtomisticsReasoner(self.onto, cache_dir=cache_dir)
+            project.inspected.clear()
+            cached = reasoner.search_database_for_property(
+                self.onto.BulkModulus(), project, select_alloy="Cu"
+            )
+            self.assertListEqual([], project.inspected, msg="Expected a cache hit")
+            self.assertTrue(searched.equals(cached))
+
+            next(r for r in project.db.rows if r["id"] == 2)["status"] = "aborted"
+            project.jobs[2]["output/equilibrium_bulk_modulus"] = np.nan
+            project.db.rows.append(dict(project.db.rows[0], id=100))
+            project.jobs[100] = dict(project.jobs[0])
+            updated = reasoner.search_database_for_property(
+                self.onto.BulkModulus(), project, select_alloy="Cu"
+            )
+            self.assertListEqual(
+                [2, 100],
+                sorted(project.inspected),
+                msg="Only new jobs and jobs with a new status should be read",
+            )
+            self.assertEqual(11, len(updated))
+            self.assertTrue(np.isnan(updated.iloc[1, 1]))
+
+            project.inspected.clear()
+            reasoner.search_database_for_property(
+                self.onto.BulkModulus(), project, select_alloy="Al"
+            )
+            self.assertEqual(
+                10, len(project.inspected), msg="Other filters are other searches"
+            )
+
+            with mock.patch.object(
+                reasoner.cache, "store", wraps=reasoner.cache.store
+            ) as store:
+                chunks = list(
+                    reasoner.iter_database_for_property(
+                        self.onto.BPrime(), project, chunk_size=3
+                    )
+                )
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual(
+                    1, store.call_count, msg="The cache is stored once per search"
+                )
+                list(
+                    reasoner.iter_database_for_property(
+                        self.onto.BPrime(), project, chunk_size=3
+                    )
+                )
+                self.assertEqual(
+                    1, store.call_count, msg="Nothing new to store on a cache hit"
+                )
+
+    def test_job_types(self):
+        project = murnaghan_project()
+        reasoner = AtomisticsReasoner(self.onto)
+        self.assertSetEqual({"Lammps", "Vasp"}, reasoner.engine_names)
+        df = reasoner.search_database_for_property(self.onto.BulkModulus(), project)
+        self.assertSetEqual({"Lammps"}, set(df["Engine"]))
+        self.assertEqual(
+            10,
+            project.read.count("ref_job/TYPE"),
+            msg="Only jobs without children in the database should need their HDF",
+        )
+
+        project.read.clear()
+        reasoner.search_database_for_property(self.onto.BPrime(), project)
+        self.assertNotIn("ref_job/TYPE", project.read, msg="Engines are remembered")
+
+    def test_properties(self):
+        project = murnaghan_project()
+        properties = [
+            self.onto.BulkModulus(),
+            self.onto.BPrime(),
+            self.onto.Energy(),
+        ]
+        df = self.reasoner.search_database_for_properties(properties, project)
+        self.assertEqual(1, len([q for q in project.db.queries if "hamilton" in q]))
+        self.assertListEqual(
+            list(range(20)), sorted(project.inspected), msg="Each job read once"
+        )
+        self.assertListEqual(list(range(20)), df.index.tolist())
+        self.assertEqual("id", df.index.name)
+        bulk_modulus, b_prime, energy = (f"{p.__class__}" for p in properties)
+        self.assertTrue(np.allclose(100.0 + np.arange(20), df[bulk_modulus]))
+        self.assertTrue(
+            np.allclose(
+                self.reasoner.search_database_for_property(properties[1], project)[
+                    b_prime
+                ],
+                df[b_prime],
+            )
+        )
+        self.assertSetEqual({"GPa"}, set(df[f"{bulk_modulus} unit"]))
+        self.assertTrue(df[energy].isna().all(), msg="No job here gives energies")
+
+        empty = self.reasoner.search_database_for_properties(
+            [self.onto.Energy()], project
+        )
+        self.assertEqual(0, len(empty))
+
+        material = f"{self.onto.MaterialProperty}"
+        both = self.reasoner.search_database_for_properties(
+            [self.onto.MaterialProperty(), self.onto.BulkModulus()], project
+        )
+        self.assertListEqual(
+            [
+                "Chemical Formula",
+                "Engine",
+                material,
+                f"{material} unit",
+                f"{material} [murnaghan_output_bulk_modulus]",
+                f"{material} [murnaghan_output_bulk_modulus] unit",
+                f"{material} [murnaghan_output_b_prime]",
+                f"{material} [murnaghan_output_b_prime] unit",
+                bulk_modulus,
+                f"{bulk_modulus} unit",
+            ],
+            list(both.columns),
+            msg="Each output of a function giving a property gets its own column",
+        )
+        self.assertTrue(
+            np.allclose(
+                df[bulk_modulus], both[f"{material} [murnaghan_output_bulk_modulus]"]
+            )
+        )
+        self.assertTrue(
+            np.allclose(df[b_prime], both[f"{material} [murnaghan_output_b_prime]"])
+        )
+        self.assertTrue(both[material].isna().all())
+
+        self.assertListEqual(
+            list(df.columns),
+            list(
+                self.reasoner.search_database_for_properties(
+                    properties + [self.onto.BulkModulus()], project
+                ).columns
+            ),
+            msg="Properties of the same class share their columns",
+        )
+        self.assertEqual(
+            0,
+            len(
+                self.reasoner.search_database_for_properties(
+                    [self.onto.Structure()], project
+                )
+            ),
+            msg="Functions without a pyiron name aren't in the database",
+        )
+
+    def test_units(self):
+        project = murnaghan_project()
+        df = self.reasoner.search_database_for_property(
+            self.onto.BulkModulus(), project, target_unit="MPa"
+        )
+        column = f"{self.onto.BulkModulus}"
+        self.assertEqual(np.float64, df[column].dtype)
+        self.assertTrue(np.allclose(1000 * (100.0 + np.arange(20)), df[column]))
+        self.assertSetEqual({"MPa"}, set(df["unit"]))
+
+        with self.assertRaises(ValueError, msg="BPrime has no unit to convert from"):
+            self.reasoner.search_database_for_property(
+                self.onto.BPrime(), project, target_unit="MPa"
+            )
+
+        joined = self.reasoner.search_database_for_properties(
+            [self.onto.BulkModulus(), self.onto.BPrime()],
+            project,
+            target_units=["GPa", None],
+        )
+        self.assertTrue(np.allclose(df[column] / 1000, joined[column]))
+        self.assertEqual(np.float64, joined[f"{self.onto.BPrime}"].dtype)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import pyiron_ontology
+from pyiron_ontology.serialization import dumps, loads, tree_from_dict, tree_to_dict
+
+from .test_tree import Cyclic
+
+
+class TestSerialization(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.onto = pyiron_ontology.AtomisticsOntology(
+            name="serialized_atomistics", reasoner="structural"
+        ).onto
+        cls.other = pyiron_ontology.AtomisticsOntology(
+            name="deserialized_atomistics", reasoner="structural"
+        ).onto
+        cls.output = cls.onto.surface_energy_output_surface_energy
+
+    @staticmethod
+    def flat(tree):
+        data = tree_to_dict(tree)
+        return [
+            (data["iris"][v][len(data["base_iri"]) :], p, t)
+            for v, p, t in zip(data["values"], data["parents"], data["truncated"])
+        ]
+
+    def test_round_trip(self):
+        tree = self.output.get_source_tree(max_nodes=30)
+        self.assertTrue(tree.truncated)
+        for binary in [False, True]:
+            for compact in [False, True]:
+                with self.subTest(binary=binary, compact=compact):
+                    serialized = dumps(tree, binary=binary)
+                    self.assertIsInstance(serialized, bytes if binary else str)
+                    loaded = loads(serialized, self.onto, compact=compact)
+                    self.assertEqual(tree.value, loaded.value)
+                    self.assertListEqual(self.flat(tree), self.flat(loaded))
+
+    def test_compact(self):
+        compact = self.output.get_source_tree(compact=True)
+        tree = self.output.get_source_tree()
+        self.assertListEqual(
+            self.flat(tree), self.flat(tree_from_dict(tree_to_dict(compact), self.onto))
+        )
+
+    def test_rebind(self):
+        tree = self.output.get_source_tree()
+        loaded = loads(dumps(tree, binary=True), self.other)
+        self.assertIs(self.other.surface_energy_output_surface_energy, loaded.value)
+        self.assertListEqual(self.flat(tree), self.flat(loaded))
+
+        with self.assertRaises(ValueError):
+            loads(dumps(tree), Cyclic("unrelated", reasoner="structural").onto)
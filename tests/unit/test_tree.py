@@ -1,6 +1,8 @@
+from io import StringIO
 from unittest import TestCase
 
 import pyiron_ontology
+from pyiron_ontology.constructor import Constructor
 
 
 class TestTree(TestCase):
@@ -31,3 +33,229 @@ class TestTree(TestCase):
             "have passed stochastically; this makes sure there was only one"
             "solution available.",
         )
+
+
+class TestSourceGraph(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.onto = pyiron_ontology.AtomisticsOntology(
+            name="graphed_atomistics", reasoner="structural"
+        ).onto
+
+    @staticmethod
+    def names(tree):
+        return [
+            tree.value.name,
+            sorted(TestSourceGraph.names(c) for c in tree.children),
+        ]
+
+    @staticmethod
+    def size(tree):
+        return 1 + sum(TestSourceGraph.size(c) for c in tree.children)
+
+    def test_graph(self):
+        output = self.onto.surface_energy_output_surface_energy
+        graph = output.get_source_graph()
+
+        nodes = {}
+        to_visit = [graph]
+        while len(to_visit) > 0:
+            node = to_visit.pop()
+            if id(node) not in nodes:
+                nodes[id(node)] = node
+                to_visit.extend(node.sources)
+        keys = [(n.value, n.requirements) for n in nodes.values()]
+        self.assertEqual(
+            len(keys), len(set(keys)), msg="Equivalent searches should be shared"
+        )
+
+        tree = graph.to_tree()
+        self.assertListEqual(self.names(output.get_source_tree()), self.names(tree))
+        self.assertGreater(
+            self.size(tree),
+            len(nodes),
+            msg="Upstream searches like the project should be reused",
+        )
+
+    def test_parallel_tree(self):
+        output = self.onto.surface_energy_output_surface_energy
+        tree = output.get_source_tree(max_workers=2)
+        self.assertListEqual(self.names(output.get_source_tree()), self.names(tree))
+        self.assertFalse(tree.truncated)
+
+        budgeted = output.get_source_tree(max_workers=2, max_nodes=12)
+        self.assertTrue(budgeted.truncated)
+        self.assertLessEqual(self.size(budgeted), 12)
+
+    def test_lazy_tree(self):
+        output = self.onto.surface_energy_output_surface_energy
+        tree = output.get_source_tree(lazy=True)
+        self.assertFalse(tree.expanded, msg="Nothing should be searched up front")
+        function = tree.children[0]
+        self.assertTrue(tree.expanded)
+        self.assertFalse(
+            function.expanded, msg="Only the accessed level should be searched"
+        )
+        self.assertListEqual(self.names(output.get_source_tree()), self.names(tree))
+
+        shallow = output.get_source_tree(max_depth=2)
+        self.assertTrue(
+            all(
+                len(inp.children) == 0
+                for function in shallow.children
+                for inp in function.children
+            ),
+            msg="Nothing beyond the max depth should be searched",
+        )
+        self.assertGreater(len(shallow.children[0].children), 0)
+
+        def flags(tree):
+            # Lazy nodes only know they are truncated once searched down to the cut
+            children = sorted(flags(c) for c in tree.children)
+            return [tree.value.name, tree.truncated, children]
+
+        lazy_shallow = output.get_source_tree(lazy=True, max_depth=2)
+        self.assertListEqual(flags(shallow), flags(lazy_shallow))
+        self.assertTrue(
+            lazy_shallow.truncated,
+            msg="Cutting off the search at a depth should be reported as truncation",
+        )
+
+    def test_iter_workflows(self):
+        output = self.onto.surface_energy_output_surface_energy
+
+        def count_workflows(tree):
+            counts = [count_workflows(c) for c in tree.children]
+            if isinstance(tree.value, (self.onto.Input, self.onto.Generic)):
+                return max(1, sum(counts))
+            product = 1
+            for count in counts:
+                product *= count
+            return product
+
+        workflows = list(output.iter_workflows())
+        self.assertEqual(count_workflows(output.get_source_tree()), len(workflows))
+        self.assertEqual(
+            len(workflows),
+            len({str(self.names(w)) for w in workflows}),
+            msg="Each workflow should be unique",
+        )
+        for workflow in workflows:
+            to_visit = [workflow]
+            while len(to_visit) > 0:
+                node = to_visit.pop()
+                if isinstance(node.value, self.onto.Input):
+                    self.assertLessEqual(len(node.children), 1)
+                to_visit.extend(node.children)
+
+        self.assertEqual(2, len(list(output.iter_workflows(limit=2))))
+
+
+class Cyclic(Constructor):
+    def _make_specific_declarations(self):
+        with self.onto:
+
+            class Loop(self.onto.Generic):
+                pass
+
+            for n in range(3):
+                function = self.onto.Function(f"function{n}")
+                self.onto.Input(
+                    name=f"function{n}_inp",
+                    mandatory_input_of=function,
+                    generic=Loop(),
+                )
+                self.onto.Output(
+                    name=f"function{n}_out",
+                    output_of=function,
+                    generic=Loop(),
+                )
+
+
+class TestBudgets(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.onto = Cyclic("cyclic", reasoner="structural").onto
+
+    def test_cycles(self):
+        tree = self.onto.function0_out.get_source_tree()
+        self.assertFalse(tree.truncated, msg="Breaking cycles is not truncation")
+        path = [tree.value]
+        while len(tree.children) > 0:
+            tree = tree.children[0]
+            self.assertNotIn(tree.value, path, msg="Nothing should be its own source")
+            path.append(tree.value)
+        self.assertEqual(3 * 3, len(path))
+
+        lazy = self.onto.function0_out.get_source_tree(lazy=True)
+        self.assertEqual(
+            2,
+            len(lazy.children[0].children[0].children),
+            msg="The output we started from should not be its own source",
+        )
+        self.assertEqual(
+            0,
+            len(list(self.onto.function0_out.iter_workflows())),
+            msg="Inputs whose only sources are cycles can't be resolved, so no "
+            "finite workflow exists",
+        )
+        self.assertListEqual(
+            TestSourceGraph.names(self.onto.function0_out.get_source_tree()),
+            TestSourceGraph.names(self.onto.function0_out.get_source_graph().to_tree()),
+        )
+
+    def test_budgets(self):
+        for budget in [{"max_depth": 3}, {"max_nodes": 10}, {"timeout": 0}]:
+            with self.subTest(str(budget)):
+                tree = self.onto.function0_out.get_source_tree(**budget)
+                self.assertTrue(tree.truncated)
+                self.assertLess(
+                    TestSourceGraph.size(tree),
+                    TestSourceGraph.size(self.onto.function0_out.get_source_tree()),
+                )
+        self.assertEqual(
+            10,
+            TestSourceGraph.size(self.onto.function0_out.get_source_tree(max_nodes=10)),
+        )
+
+    def test_compact(self):
+        output = self.onto.function0_out
+        for kwargs in [{}, {"max_nodes": 10}, {"max_workers": 2}]:
+            with self.subTest(str(kwargs)):
+                tree = output.get_source_tree(**kwargs)
+                compact = output.get_source_tree(compact=True, **kwargs)
+                self.assertListEqual(
+                    TestSourceGraph.names(tree), TestSourceGraph.names(compact)
+                )
+                self.assertEqual(tree.truncated, compact.truncated)
+                self.assertEqual(TestSourceGraph.size(tree), len(compact.tree))
+
+        compact = output.get_source_tree(compact=True)
+        child = compact.children[0]
+        self.assertEqual(compact, child.parent)
+        self.assertIsNone(compact.parent)
+
+    def test_render(self):
+        tree = self.onto.function0_out.get_source_tree()
+        stream = StringIO()
+        tree.render(stream=stream, chunk_size=2)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(TestSourceGraph.size(tree), len(lines))
+        self.assertEqual("function0_out", lines[0])
+        self.assertEqual("  function0", lines[1])
+
+        compact = StringIO()
+        self.onto.function0_out.get_source_tree(compact=True).render(stream=compact)
+        self.assertEqual(stream.getvalue(), compact.getvalue())
+
+        stream = StringIO()
+        tree.render(stream=stream, max_depth=1)
+        self.assertListEqual(
+            ["function0_out", "  function0"], stream.getvalue().splitlines()
+        )
+
+        stream = StringIO()
+        tree.render(stream=stream, max_nodes=4)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertEqual("...", lines[-1].strip())